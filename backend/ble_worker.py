@@ -2,6 +2,7 @@
 # Copyright (c) 2025 Paul Shapiro
 from __future__ import annotations
 import os
+import sys
 import asyncio
 import time
 import threading
@@ -10,12 +11,17 @@ from typing import Optional, Callable, List, Tuple
 from bleak import BleakScanner, BleakClient, BleakError
 from flask_socketio import SocketIO
 
+try:
+    import uvloop  # optional: lower callback dispatch overhead for notifications
+except ImportError:
+    uvloop = None
+
 try:
     from .gan_decrypt import derive_key_iv, decrypt_packet, parse_move, CubeEvent, MoveEvent, FaceletsEvent
-    from .gan_protocol_driver import GanGen3ProtocolDriver, GanCubeConnection, GanCubeRawConnection
+    from .gan_protocol_driver import GanGen3ProtocolDriver, GanCubeConnection, GanCubeRawConnection, VERBOSE
 except ImportError:
     from gan_decrypt import derive_key_iv, decrypt_packet, parse_move, CubeEvent, MoveEvent, FaceletsEvent
-    from gan_protocol_driver import GanGen3ProtocolDriver, GanCubeConnection, GanCubeRawConnection
+    from gan_protocol_driver import GanGen3ProtocolDriver, GanCubeConnection, GanCubeRawConnection, VERBOSE
 
 # GAN Gen3 Service and Characteristic UUIDs (for GAN356 i Carry 2)
 SERVICE_UUID = "8653000a-43e6-47b7-9cb0-5fc21d4ae340"
@@ -25,11 +31,15 @@ COMMAND_CHAR_UUID = "8653000c-43e6-47b7-9cb0-5fc21d4ae340"
 # Global state
 socketio: Optional[SocketIO] = None
 _connection: Optional[GanCubeConnection] = None
-_key_iv: Optional[Tuple[bytes, bytes]] = None
+_key: Optional[bytes] = None  # AES key/IV for the current cube, bound separately
+_iv: Optional[bytes] = None   # so the notify handler doesn't index a tuple per packet
 _solve_callbacks: List[Callable[[], None]] = []
 _move_callbacks: List[Callable[[dict], None]] = []
 _connection_callbacks: List[Callable[[bool], None]] = []
 _connection_time: Optional[float] = None  # Track when cube was connected
+_disconnected: Optional[asyncio.Event] = None  # Set by bleak when the link drops
+_packet_queue: Optional[asyncio.Queue] = None  # Raw notifications awaiting _process_packets
+_packet_task: Optional[asyncio.Task] = None
 _CONNECTION_SOLVED_DELAY = 0.5  # Reduced from 1.0 to 0.5 seconds for faster alarm response
 
 # Enhanced configuration - optimized for faster connection
@@ -37,6 +47,10 @@ VALID_LENGTHS = (18, 20)
 RECONNECT_DELAY = 2  # Reduced from 5 to 2 seconds
 SCAN_TIMEOUT = 5     # Reduced from 10 to 5 seconds  
 MAX_RECONNECT_ATTEMPTS = 2  # Reduced from 3 to 2 attempts
+BLE_SUBSCRIBE_FIRST_TIMEOUT = 3  # seconds for the first start_notify
+BLE_SUBSCRIBE_RETRY_TIMEOUT = 5  # seconds for the retry after clearing the CCCD
+CCCD_UUID_PREFIX = "00002902"    # Client Characteristic Configuration descriptor
+LOG_FLUSH_INTERVAL = 0.2         # seconds between stdout flushes while the BLE loop runs
 
 # Manual override mapping of device names (or address fragments) to real MAC
 _REAL_MAC_OVERRIDE: dict[str, str] = {
@@ -44,10 +58,70 @@ _REAL_MAC_OVERRIDE: dict[str, str] = {
 }
 
 
+_log_buf: Optional[List[str]] = None  # Pending log lines while _log_flusher runs
+_log_stamp: Tuple[int, str] = (-1, "")  # (epoch second, "%H:%M:%S") of the last _log
+
+
 def _log(msg: str):
-    """Enhanced logging with timestamps."""
-    timestamp = time.strftime("%H:%M:%S")
-    print(f"[{timestamp}] {msg}", flush=True)
+    """Enhanced logging with timestamps.
+
+    While the BLE loop is running, lines are buffered and written by
+    ``_log_flusher`` so the notification path never blocks on stdout.
+    """
+    global _log_stamp
+    now = int(time.time())
+    second, timestamp = _log_stamp
+    if now != second:
+        # Bursts of lines within one second share a single strftime
+        timestamp = time.strftime("%H:%M:%S", time.localtime(now))
+        _log_stamp = (now, timestamp)
+    line = f"[{timestamp}] {msg}\n"
+    buf = _log_buf
+    if buf is None:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+    else:
+        buf.append(line)
+
+def _write_log_lines(buf: List[str]) -> None:
+    """Write and remove the lines currently in ``buf``."""
+    lines = buf[:]
+    if lines:
+        del buf[:len(lines)]  # _log may append from other threads meanwhile
+        sys.stdout.write("".join(lines))
+        sys.stdout.flush()
+
+async def _log_flusher(buf: List[str]) -> None:
+    """Flush ``buf`` to stdout every LOG_FLUSH_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(LOG_FLUSH_INTERVAL)
+        _write_log_lines(buf)
+
+def _run_loop(coro) -> None:
+    """Run ``coro`` to completion, on uvloop when it is installed."""
+    if uvloop is not None and hasattr(uvloop, "run"):  # uvloop >= 0.18
+        uvloop.run(coro)
+    elif uvloop is not None and hasattr(asyncio, "Runner"):  # older uvloop, Python 3.11+
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(coro)
+    else:
+        asyncio.run(coro)
+
+async def _run_with_log_flusher(coro) -> None:
+    """Run ``coro`` with log buffering enabled for its lifetime."""
+    global _log_buf
+    buf = _log_buf = []
+    flusher = asyncio.create_task(_log_flusher(buf))
+    try:
+        await coro
+    finally:
+        flusher.cancel()
+        try:
+            await flusher
+        except asyncio.CancelledError:
+            pass
+        _log_buf = None
+        _write_log_lines(buf)
 
 def add_solve_callback(callback: Callable[[], None]) -> None:
     """Add a callback to be called when cube is solved."""
@@ -168,7 +242,8 @@ async def _handle_cube_event(event: CubeEvent) -> None:
     
     if isinstance(event, MoveEvent):
         move_dict = event.move.to_dict()
-        _log(f"🔄 Move: {event.move.move} (serial: {event.move.serial})")
+        if VERBOSE:
+            _log(f"🔄 Move: {event.move.move} (serial: {event.move.serial})")
         
         # Emit to Socket.IO if available
         if socketio:
@@ -188,7 +263,8 @@ async def _handle_cube_event(event: CubeEvent) -> None:
         # detection now relies solely on facelet events.
     
     elif isinstance(event, FaceletsEvent):
-        _log(f"Facelets update (serial: {event.serial})")
+        if VERBOSE:
+            _log(f"Facelets update (serial: {event.serial})")
         
         # Check if cube is solved based on facelets state
         if event.state.is_solved():
@@ -279,9 +355,11 @@ async def _create_raw_connection(client: BleakClient) -> GanCubeRawConnection:
     async def send_command(message: bytes) -> None:
         """Send command to cube."""
         try:
-            _log(f"🔧 DEBUG: Sending {len(message)} bytes to cube: {message.hex()}")
+            if VERBOSE:
+                _log(f"🔧 DEBUG: Sending {len(message)} bytes to cube: {message.hex()}")
             await client.write_gatt_char(COMMAND_CHAR_UUID, message)
-            _log(f"✅ DEBUG: Command sent successfully")
+            if VERBOSE:
+                _log(f"✅ DEBUG: Command sent successfully")
         except Exception as e:
             _log(f"❌ Error sending command: {e}")
     
@@ -297,25 +375,52 @@ async def _create_raw_connection(client: BleakClient) -> GanCubeRawConnection:
         disconnect=disconnect
     )
 
-async def _notify_handler(_, data: bytes) -> None:
-    """Enhanced BLE notification handler with robust processing."""
-    global _connection, _key_iv
-    
-    if not _connection or not _key_iv:
+def _notify_handler(_, data: bytes) -> None:
+    """BLE notification handler.
+
+    Only queues the packet, so bleak doesn't spawn a task per notification;
+    ``_process_packets`` handles them in arrival order.
+    """
+    if not _connection or not _key or _packet_queue is None:
         return
     
     # Log packet info for debugging (disabled for cleaner output)
     # _log(f"📦 Received packet: {len(data)} bytes - {data.hex()[:32]}{'...' if len(data) > 16 else ''}")
     
+    _packet_queue.put_nowait(bytes(data))
+
+async def _handle_packet(data: bytes) -> None:
+    """Decrypt and dispatch one notification through the protocol driver."""
     # Handle all packet lengths, not just move packets
     try:
-        await _connection.handle_notification(data, _key_iv[0], _key_iv[1])
+        await _connection.handle_notification(data, _key, _iv)
     except Exception as e:
         _log(f"❌ Error processing notification (len={len(data)}): {e}")
         # Don't log raw data for every error to avoid spam
-        if len(data) not in [16, 18, 19, 20]:
+        if VERBOSE and len(data) not in (16, 18, 19, 20):
             _log(f"   Raw data: {data.hex()}")
 
+async def _process_packets(queue: asyncio.Queue) -> None:
+    """Consume queued notifications, draining bursts without re-suspending."""
+    while True:
+        await _handle_packet(await queue.get())
+        while not queue.empty():
+            await _handle_packet(queue.get_nowait())
+
+def _start_packet_processing() -> None:
+    """Create a fresh packet queue and its consumer task for a new connection."""
+    global _packet_queue, _packet_task
+    _stop_packet_processing()
+    _packet_queue = asyncio.Queue()
+    _packet_task = asyncio.create_task(_process_packets(_packet_queue))
+
+def _stop_packet_processing() -> None:
+    """Cancel the consumer task and drop any packets still queued."""
+    global _packet_queue, _packet_task
+    if _packet_task:
+        _packet_task.cancel()
+    _packet_queue = _packet_task = None
+
 def _extract_mac_from_manufacturer(advertisement_data) -> Optional[str]:
     """Return MAC string like CF:AA:79:C9:96:9C from manufacturer data matching GAN cubes (company id 0x0001)."""
     mdata = advertisement_data.manufacturer_data or {}
@@ -326,7 +431,7 @@ def _extract_mac_from_manufacturer(advertisement_data) -> Optional[str]:
         return None
     mac_bytes = payload[0:6]
     # Format as XX:XX:XX:XX:XX:XX (same ordering as JS which later reverses again)
-    return ':'.join(f"{b:02X}" for b in mac_bytes)
+    return mac_bytes.hex(':').upper()
 
 async def _discover_cube(timeout: int = SCAN_TIMEOUT):
     """Scan for BLE devices and return (device, real_mac) for the first GAN cube found."""
@@ -336,18 +441,22 @@ async def _discover_cube(timeout: int = SCAN_TIMEOUT):
     # Reset map each scan
     _real_mac_map = {}
 
-    async with BleakScanner(detection_callback=lambda d, a: _real_mac_map.__setitem__(d.address, _extract_mac_from_manufacturer(a))) as scanner:
+    found = asyncio.Event()
+
+    def on_detect(d, a):
+        mac = _real_mac_map[d.address] = _extract_mac_from_manufacturer(a)
+        # Stop early once a GAN device with a non-zero real MAC is seen
+        if (not found.is_set() and mac and mac[:2] != "00" and d.name
+                and any(p in d.name.upper() for p in ("GAN", "MG", "AICUBE"))):
+            _log(f"🚀 Found target cube quickly: {d.name} with MAC {mac}")
+            found.set()
+
+    async with BleakScanner(detection_callback=on_detect) as scanner:
         # Scan until timeout or until we captured a real MAC for at least one GAN device
-        end_time = asyncio.get_event_loop().time() + timeout
-        while asyncio.get_event_loop().time() < end_time:
-            await asyncio.sleep(0.1)  # Reduced from 0.2 to 0.1 for faster detection
-            # quick check: any captured mac with non-zero bytes and GAN name?
-            for d in scanner.discovered_devices:
-                mac = _real_mac_map.get(d.address)
-                if mac and mac[:2] != "00" and d.name and any(p in d.name.upper() for p in ["GAN", "MG", "AICUBE"]):
-                    _log(f"🚀 Found target cube quickly: {d.name} with MAC {mac}")
-                    end_time = asyncio.get_event_loop().time()  # break outer loop
-                    break
+        try:
+            await asyncio.wait_for(found.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
         devices = scanner.discovered_devices
 
     # Debug list
@@ -396,18 +505,47 @@ async def _discover_cube(timeout: int = SCAN_TIMEOUT):
     _log("❌ No GAN cubes found that match filter criteria")
     return None, None
 
+async def _start_state_notify(client: BleakClient) -> None:
+    """Subscribe to state notifications with bounded waits.
+
+    BlueZ can hang in start_notify or refuse it with "Notify acquired" when
+    the CCCD is still enabled from an earlier session.  On either, clear the
+    CCCD and subscribe once more; a second failure propagates to the caller's
+    reconnect logic.
+    """
+    try:
+        await asyncio.wait_for(client.start_notify(STATE_CHAR_UUID, _notify_handler),
+                               BLE_SUBSCRIBE_FIRST_TIMEOUT)
+        return
+    except (asyncio.TimeoutError, BleakError) as e:
+        _log(f"⚠️ start_notify failed ({type(e).__name__}: {e}); clearing CCCD and retrying")
+
+    char = client.services.get_characteristic(STATE_CHAR_UUID)
+    cccd = next((d for d in char.descriptors if d.uuid.startswith(CCCD_UUID_PREFIX)), None) if char else None
+    if cccd is not None:
+        try:
+            await client.write_gatt_descriptor(cccd.handle, b"\x00\x00")
+        except BleakError as e:
+            _log(f"⚠️ Could not clear CCCD: {e}")
+
+    await asyncio.wait_for(client.start_notify(STATE_CHAR_UUID, _notify_handler),
+                           BLE_SUBSCRIBE_RETRY_TIMEOUT)
+
 async def _connect_to_cube(device, real_mac: Optional[str]) -> Optional[GanCubeConnection]:
     """Enhanced cube connection with retry logic."""
-    global _key_iv, _connection_time
+    global _key, _iv, _connection_time, _disconnected
     
     _log(f"🔗 Connecting to {device.name} [{device.address}]...")
     mac_for_key = real_mac or device.address
     _log(f"🔑 Using MAC {mac_for_key} for key derivation")
-    _key_iv = derive_key_iv(mac_for_key)
+    _key, _iv = derive_key_iv(mac_for_key)
     
     for attempt in range(MAX_RECONNECT_ATTEMPTS):
         try:
-            client = BleakClient(device)
+            # Bind this attempt's Event: a late callback from an earlier client
+            # must not tear down the next connection
+            disconnected = _disconnected = asyncio.Event()
+            client = BleakClient(device, disconnected_callback=lambda _c, ev=disconnected: ev.set())
             await client.connect()
             
             # Verify services are available
@@ -432,15 +570,16 @@ async def _connect_to_cube(device, real_mac: Optional[str]) -> Optional[GanCubeC
                 device_mac=device.address,
                 raw_connection=raw_connection,
                 protocol_driver=protocol_driver,
-                key=_key_iv[0],
-                iv=_key_iv[1]
+                key=_key,
+                iv=_iv
             )
             
             # Add event callback
             connection.add_event_callback(_handle_cube_event)
             
             # Start notifications
-            await client.start_notify(STATE_CHAR_UUID, _notify_handler)
+            _start_packet_processing()
+            await _start_state_notify(client)
             
             _log("✅ Connected successfully! Move the cube to see events.")
             
@@ -499,12 +638,16 @@ async def _ble_loop() -> None:
             
             # Keep connection alive and process reset requests
             try:
-                while True:
+                while not _disconnected.is_set():
                     # Check for reset requests (but don't process continuously)
                     await _process_reset_requests()
                     
-                    # Sleep longer to avoid busy waiting and command spam
-                    await asyncio.sleep(1.0)
+                    # Sleep until the next reset check, waking early on disconnect
+                    try:
+                        await asyncio.wait_for(_disconnected.wait(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        pass
+                _log("⚠️ Cube disconnected")
                     
             except asyncio.CancelledError:
                 _log("🛑 BLE loop cancelled")
@@ -514,6 +657,7 @@ async def _ble_loop() -> None:
             await asyncio.sleep(RECONNECT_DELAY)
         finally:
             # Clean up connection
+            _stop_packet_processing()
             if _connection:
                 try:
                     await _connection.disconnect()
@@ -549,7 +693,7 @@ def start_ble_worker(socketio_ref: Optional[SocketIO] = None) -> bool:
             _ble_loop_running = True
             # Create a new stop event bound to this thread's event loop
             _stop_ble_event = asyncio.Event()
-            asyncio.run(_ble_loop_with_stop())
+            _run_loop(_run_with_log_flusher(_ble_loop_with_stop()))
         except Exception as e:
             _log(f"❌ BLE worker error: {e}")
         finally:
@@ -621,6 +765,10 @@ async def _ble_loop_with_stop():
             # Keep connection alive and process reset requests
             try:
                 while not _stop_ble_event.is_set():
+                    if _disconnected.is_set():
+                        _log("⚠️ Cube disconnected")
+                        break
+                    
                     # Check for reset requests
                     await _process_reset_requests()
                     
@@ -645,6 +793,7 @@ async def _ble_loop_with_stop():
                 continue  # Continue with error recovery
         finally:
             # Clean up connection
+            _stop_packet_processing()
             if _connection:
                 try:
                     await _connection.disconnect()
@@ -675,7 +824,7 @@ def run(socketio_ref: Optional[SocketIO] = None) -> None:
     _log(f"📤 Command characteristic: {COMMAND_CHAR_UUID}")
     
     try:
-        asyncio.run(_ble_loop())
+        _run_loop(_run_with_log_flusher(_ble_loop()))
     except KeyboardInterrupt:
         _log("🛑 Stopped by user")
     except Exception as e:
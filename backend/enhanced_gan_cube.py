@@ -7,6 +7,8 @@ Uses real MAC address extraction and robust connection handling.
 """
 
 import asyncio
+import signal
+import struct
 import time
 import logging
 from typing import Optional, Callable, Dict, Any, List
@@ -14,10 +16,35 @@ from bleak import BleakScanner, BleakClient
 from dataclasses import dataclass
 import numpy as np
 
+try:
+    from gan_decrypt import decrypt_packet, derive_key_iv as _derive_key_iv
+except ImportError:
+    decrypt_packet = _derive_key_iv = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Gen3 move packet header: bytes 0-9 (no padding with '<')
+_GEN3_MOVE_HEADER = struct.Struct('<BBBIHB')
+_MOVE_PREFIX = b'\x55\x01'  # magic 0x55, eventType 0x01
+
+# struct formats for byte-aligned get_bit_word reads: (bit_length, little_endian) -> format
+_ALIGNED_FORMATS = {
+    (8, False): 'B', (8, True): 'B',
+    (16, False): '>H', (16, True): '<H',
+    (32, False): '>I', (32, True): '<I',
+}
+
+# Gen3 face bits -> index into "URFDLB" (JavaScript face map [2, 32, 8, 1, 16, 4]);
+# 0xFF marks bit patterns that aren't a face
+_FACE_LUT = bytearray(b'\xff' * 64)
+for _index, _bits in enumerate((2, 32, 8, 1, 16, 4)):
+    _FACE_LUT[_bits] = _index
+_FACE_LUT = bytes(_FACE_LUT)
+del _index, _bits
+_DIR_CHAR = " '??"  # indexed by the 2-bit direction field
+
 @dataclass
 class CubeMove:
     """Represents a cube move."""
@@ -64,6 +91,11 @@ class EnhancedGANCube:
         self.solve_callback: Optional[Callable[[], None]] = None
         self._key_iv: Optional[tuple] = None
         self._running = False
+        self._packet_queue: Optional[asyncio.Queue] = None
+        self._packet_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None  # set on disconnect or stop()
+        self._session: Optional[object] = None  # token of the client whose disconnects count
         
     def set_move_callback(self, callback: Callable[[CubeMove], None]):
         """Set callback for move events."""
@@ -75,21 +107,15 @@ class EnhancedGANCube:
     
     def extract_mac_from_manufacturer_data(self, manufacturer_data: Dict[int, bytes]) -> Optional[str]:
         """Extract real MAC address from BLE manufacturer data."""
-        # GAN Company Identifier Codes
-        gan_cic_list = [(i << 8) | 0x01 for i in range(256)]
-        
-        for cic in gan_cic_list:
-            if cic in manufacturer_data:
-                data = manufacturer_data[cic]
+        # GAN Company Identifier Codes are 0xXX01.  Advertisements carry one
+        # or two CICs, so walk those and test the low byte
+        for cic, data in manufacturer_data.items():
+            if cic & 0xFF == 0x01:
                 logger.info(f"Found GAN CIC {cic:04x} with {len(data)} bytes")
                 
                 if len(data) >= 6:
-                    # Extract MAC from last 6 bytes (matching JavaScript)
-                    mac_bytes = []
-                    for i in range(1, 7):  # 1 to 6
-                        mac_bytes.append(data[len(data) - i])
-                    
-                    mac_address = ":".join(f"{b:02X}" for b in mac_bytes)
+                    # Extract MAC from last 6 bytes, reversed (matching JavaScript)
+                    mac_address = data[-6:][::-1].hex(":").upper()
                     logger.info(f"Extracted real MAC: {mac_address}")
                     return mac_address
         
@@ -100,10 +126,11 @@ class EnhancedGANCube:
         logger.info("Scanning for GAN cubes...")
         
         cube_info = None
+        found = asyncio.Event()
         
         def detection_callback(device, advertisement_data):
             nonlocal cube_info
-            if device.name and "GAN" in device.name.upper():
+            if cube_info is None and device.name and "GAN" in device.name.upper():
                 logger.info(f"Found GAN device: {device.name}")
                 
                 if advertisement_data.manufacturer_data:
@@ -113,95 +140,85 @@ class EnhancedGANCube:
                     if real_mac:
                         cube_info = (device, real_mac)
                         logger.info(f"Successfully extracted MAC: {real_mac}")
+                        found.set()
         
         scanner = BleakScanner(detection_callback=detection_callback)
         await scanner.start()
         
-        # Wait for cube discovery
-        start_time = time.time()
-        while cube_info is None and (time.time() - start_time) < timeout:
-            await asyncio.sleep(0.1)
+        # Stop scanning as soon as the callback reports the cube; the device
+        # object it saw goes straight to BleakClient, so no second scan
+        try:
+            await asyncio.wait_for(found.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
         
         await scanner.stop()
         return cube_info
     
     def derive_key_iv(self, mac_address: str) -> tuple:
         """Derive encryption key and IV from real MAC address."""
-        try:
-            from gan_decrypt import derive_key_iv
-            return derive_key_iv(mac_address)
-        except ImportError:
+        if _derive_key_iv is None:
             logger.error("gan_decrypt module not available")
             return None, None
+        return _derive_key_iv(mac_address)
     
     def get_bit_word(self, data: bytes, bit_offset: int, bit_length: int, little_endian: bool = False) -> int:
         """Extract bit word from byte array, matching JavaScript implementation."""
-        byte_offset = bit_offset // 8
-        bit_shift = bit_offset % 8
+        byte_offset, bit_shift = divmod(bit_offset, 8)
         
         # Calculate how many bytes we need
-        bytes_needed = ((bit_length + bit_shift + 7) // 8)
+        bytes_needed = (bit_length + bit_shift + 7) // 8
         
         if byte_offset + bytes_needed > len(data):
             return 0
         
-        # Extract bytes and convert to integer
-        value = 0
-        for i in range(bytes_needed):
-            if byte_offset + i < len(data):
-                if little_endian:
-                    value |= data[byte_offset + i] << (i * 8)
-                else:
-                    value = (value << 8) | data[byte_offset + i]
+        # Byte-aligned 8/16/32-bit fields read straight out of the buffer
+        if not bit_shift:
+            fmt = _ALIGNED_FORMATS.get((bit_length, little_endian))
+            if fmt:
+                return struct.unpack_from(fmt, data, byte_offset)[0]
         
-        # Apply bit shift and mask
+        # Otherwise convert the covering bytes in one call, then shift and mask
+        value = int.from_bytes(data[byte_offset:byte_offset + bytes_needed],
+                               'little' if little_endian else 'big')
         if not little_endian:
             value >>= (bytes_needed * 8 - bit_shift - bit_length)
         else:
             value >>= bit_shift
-        
-        # Apply bit mask
-        mask = (1 << bit_length) - 1
-        return value & mask
+        return value & ((1 << bit_length) - 1)
     
     def parse_gen3_move(self, decrypted: bytes) -> Optional[CubeMove]:
         """Parse Gen3 move packet to extract specific move information."""
-        if len(decrypted) < 10:
+        # Only Gen3 move packets (magic=0x55, eventType=0x01) are parsed further
+        if len(decrypted) < 10 or decrypted[:2] != _MOVE_PREFIX:
             return None
         
-        # Parse using Gen3 protocol (matching JavaScript)
-        magic = self.get_bit_word(decrypted, 0, 8)  # Byte 0
-        event_type = self.get_bit_word(decrypted, 8, 8)  # Byte 1
-        data_length = self.get_bit_word(decrypted, 16, 8)  # Byte 2
+        # Parse using Gen3 protocol (matching JavaScript): magic, event type,
+        # length, LE u32 timestamp, LE u16 serial, then direction/face byte
+        _, _, data_length, cube_timestamp, serial, move_byte = \
+            _GEN3_MOVE_HEADER.unpack_from(decrypted, 0)
         
-        # Check for Gen3 move packet (magic=0x55, eventType=0x01)
-        if magic == 0x55 and event_type == 0x01 and data_length > 0:
-            # Parse move data (matching JavaScript bit positions)
-            cube_timestamp = self.get_bit_word(decrypted, 24, 32, True)  # Little endian timestamp
-            serial = self.get_bit_word(decrypted, 56, 16, True)  # Little endian serial
-            
-            direction = self.get_bit_word(decrypted, 72, 2)  # 2 bits for direction
-            face_bits = self.get_bit_word(decrypted, 74, 6)  # 6 bits for face
+        if data_length > 0:
+            direction = move_byte >> 6  # top 2 bits for direction
+            face_bits = move_byte & 0x3F  # low 6 bits for face
             
             # Map face bits to face index (from JavaScript)
-            face_map = [2, 32, 8, 1, 16, 4]  # Maps to URFDLB
-            try:
-                face_index = face_map.index(face_bits)
-                face_char = "URFDLB"[face_index]
-                direction_char = " '"[direction] if direction < 2 else "?"
-                move_name = face_char + direction_char
-                
-                return CubeMove(
-                    move=move_name,
-                    timestamp=time.time(),
-                    serial=serial,
-                    face=face_char,
-                    direction=direction_char
-                )
-                
-            except ValueError:
-                logger.warning(f"Unknown face bits: 0x{face_bits:02x}")
+            face_index = _FACE_LUT[face_bits]
+            if face_index == 0xFF:
+                logger.warning("Unknown face bits: 0x%02x", face_bits)
                 return None
+            
+            face_char = "URFDLB"[face_index]
+            direction_char = _DIR_CHAR[direction]
+            move_name = face_char + direction_char
+            
+            return CubeMove(
+                move=move_name,
+                timestamp=time.time(),
+                serial=serial,
+                face=face_char,
+                direction=direction_char
+            )
         
         return None
     
@@ -214,7 +231,7 @@ class EnhancedGANCube:
         if hasattr(self, '_packet_history') and len(self._packet_history) > 10:
             # Check if recent packets show a stable pattern (potential solved state)
             recent_packets = self._packet_history[-5:]
-            if len(set(packet.hex() for packet in recent_packets)) == 1:
+            if recent_packets.count(recent_packets[0]) == len(recent_packets):
                 # Same packet repeated - might be solved state
                 logger.info("🔍 Detected stable packet pattern - potential solved state")
                 return True
@@ -242,18 +259,12 @@ class EnhancedGANCube:
         if len(data) == 0:
             return 0.0
         
-        # Count byte frequencies
-        byte_counts = {}
-        for byte in data:
-            byte_counts[byte] = byte_counts.get(byte, 0) + 1
-        
-        # Calculate entropy
-        entropy = 0.0
-        data_len = len(data)
-        for count in byte_counts.values():
-            probability = count / data_len
-            if probability > 0:
-                entropy -= probability * np.log2(probability)
+        # Byte histogram and entropy in a few C-level calls rather than a
+        # Python loop inside the notification callback
+        arr = np.frombuffer(data, dtype=np.uint8)
+        counts = np.bincount(arr, minlength=256)
+        p = counts[counts > 0] / arr.size
+        entropy = float(-(p * np.log2(p)).sum())
         
         return entropy / 8.0  # Normalize to 0-1 range
     
@@ -276,9 +287,9 @@ class EnhancedGANCube:
             self._recent_entropies.pop(0)
         
         # Log entropy for debugging
-        if len(self._recent_entropies) % 5 == 0:
+        if len(self._recent_entropies) % 5 == 0 and logger.isEnabledFor(logging.DEBUG):
             avg_entropy = sum(self._recent_entropies[-5:]) / 5
-            logger.debug(f"📊 Avg packet entropy: {avg_entropy:.3f}")
+            logger.debug("📊 Avg packet entropy: %.3f", avg_entropy)
     
     def analyze_packet(self, data: bytes) -> Optional[CubeMove]:
         """Analyze packet for move detection with enhanced parsing."""
@@ -290,7 +301,6 @@ class EnhancedGANCube:
         # Try decryption if we have keys
         if self._key_iv:
             try:
-                from gan_decrypt import decrypt_packet
                 decrypted = decrypt_packet(data, self._key_iv[0], self._key_iv[1])
                 
                 # Update decrypted packet history too
@@ -314,7 +324,7 @@ class EnhancedGANCube:
                     elif old_solved and not self.state.cube_state.is_solved:
                         logger.info("🔄 Cube no longer solved")
                     
-                    logger.info(f"Specific move detected: {move.move} (serial: {move.serial})")
+                    logger.info("Specific move detected: %s (serial: %d)", move.move, move.serial)
                     return move
                 
                 # Fallback: detect generic moves based on packet changes
@@ -342,14 +352,14 @@ class EnhancedGANCube:
                         elif old_solved and not self.state.cube_state.is_solved:
                             logger.info("🔄 Cube no longer solved")
                         
-                        logger.info(f"Generic move detected: {move.move}")
+                        logger.info("Generic move detected: %s", move.move)
                         self._last_packet = decrypted
                         return move
                     
                     self._last_packet = decrypted
                     
             except Exception as e:
-                logger.warning(f"Decryption failed: {e}")
+                logger.warning("Decryption failed: %s", e)
         
         # Fallback: detect moves based on raw packet timing and changes
         if hasattr(self, '_last_raw_packet'):
@@ -376,26 +386,39 @@ class EnhancedGANCube:
                 elif old_solved and not self.state.cube_state.is_solved:
                     logger.info("🔄 Cube no longer solved")
                 
-                logger.info(f"Raw move detected: {move.move}")
+                logger.info("Raw move detected: %s", move.move)
                 self._last_raw_packet = data
                 return move
         
         self._last_raw_packet = data
         return None
     
-    async def notification_handler(self, _, data: bytes):
-        """Handle BLE notifications."""
-        move = self.analyze_packet(data)
-        
-        if move:
-            # Call move callback
-            if self.move_callback:
-                self.move_callback(move)
-            
-            # Check for solved state and call solve callback
-            if self.state.cube_state.is_solved and self.solve_callback:
-                logger.info("🎉 Cube solved state detected!")
-                self.solve_callback()
+    def notification_handler(self, _, data: bytes):
+        """Handle BLE notifications.
+
+        Only queues the packet so bleak's callback returns immediately;
+        decryption, analysis and logging happen in ``_process_packets``.
+        """
+        self._packet_queue.put_nowait(bytes(data))
+    
+    async def _process_packets(self):
+        """Consume queued notifications and dispatch move/solve callbacks."""
+        while True:
+            data = await self._packet_queue.get()
+            try:
+                move = self.analyze_packet(data)
+                
+                if move:
+                    # Call move callback
+                    if self.move_callback:
+                        self.move_callback(move)
+                    
+                    # Check for solved state and call solve callback
+                    if self.state.cube_state.is_solved and self.solve_callback:
+                        logger.info("🎉 Cube solved state detected!")
+                        self.solve_callback()
+            except Exception as e:
+                logger.error("Packet processing error: %s", e)
     
     async def connect(self, timeout: int = 10) -> bool:
         """Connect to GAN cube."""
@@ -415,11 +438,16 @@ class EnhancedGANCube:
             if self._key_iv[0] is None:
                 logger.warning("Could not derive encryption keys")
             
-            # Connect to device
-            self.client = BleakClient(device)
+            # Connect to device; bleak reports link loss through the callback,
+            # which is bound to this client's session so stale clients are ignored
+            session = self._session = object()
+            self.client = BleakClient(device, disconnected_callback=self._disconnect_callback(session))
             await self.client.connect()
             
             # Start notifications
+            if self._packet_task is None:
+                self._packet_queue = asyncio.Queue()
+                self._packet_task = asyncio.create_task(self._process_packets())
             await self.client.start_notify(self.STATE_CHAR_UUID, self.notification_handler)
             
             self.state.connected = True
@@ -428,8 +456,26 @@ class EnhancedGANCube:
             
         except Exception as e:
             logger.error(f"Connection failed: {e}")
+            # Don't leave a half-set-up link open on the controller; its
+            # disconnect callback is retired first so it can't wake run()
+            self._session = None
+            if self.client and self.client.is_connected:
+                try:
+                    await self.client.disconnect()
+                except Exception:
+                    pass
             return False
     
+    def _disconnect_callback(self, session: object) -> Callable[[BleakClient], None]:
+        """Build a bleak disconnected_callback that only acts for ``session``."""
+        def on_disconnected(_client: BleakClient):
+            if self._session is not session:
+                return  # late callback from an earlier client
+            self.state.connected = False
+            if self._wake:
+                self._wake.set()
+        return on_disconnected
+    
     async def disconnect(self):
         """Disconnect from cube."""
         if self.client and self.client.is_connected:
@@ -439,6 +485,10 @@ class EnhancedGANCube:
             except Exception as e:
                 logger.warning(f"Disconnect error: {e}")
         
+        if self._packet_task:
+            self._packet_task.cancel()
+            self._packet_task = None
+        
         self.state.connected = False
         self.client = None
         logger.info("Disconnected from cube")
@@ -446,6 +496,8 @@ class EnhancedGANCube:
     async def run(self):
         """Run the cube connection loop."""
         self._running = True
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
         
         while self._running:
             if not self.state.connected:
@@ -454,15 +506,24 @@ class EnhancedGANCube:
                     logger.info("Cube connected successfully")
                 else:
                     logger.warning("Connection failed, retrying in 5 seconds...")
-                    await asyncio.sleep(5)
+                    # Back off, but let stop() cut the wait short.  stop() may
+                    # have run during connect(), so re-check after the clear.
+                    self._wake.clear()
+                    if self._running:
+                        try:
+                            await asyncio.wait_for(self._wake.wait(), timeout=5)
+                        except asyncio.TimeoutError:
+                            pass
                     continue
             
             try:
-                # Keep connection alive
-                await asyncio.sleep(1)
+                # Sleep until bleak reports a disconnect or stop() is called;
+                # a stop() that landed before the clear is caught by _running
+                self._wake.clear()
+                if self._running and self.client and self.client.is_connected:
+                    await self._wake.wait()
                 
-                # Check if still connected
-                if self.client and not self.client.is_connected:
+                if self._running:
                     logger.warning("Connection lost")
                     self.state.connected = False
                     
@@ -473,6 +534,9 @@ class EnhancedGANCube:
     def stop(self):
         """Stop the cube connection."""
         self._running = False
+        if self._loop and self._wake:
+            # May be called from another thread
+            self._loop.call_soon_threadsafe(self._wake.set)
     
     def get_cube_state(self) -> CubeStateInfo:
         """Get current cube state information."""
@@ -496,10 +560,20 @@ async def main():
     cube.set_move_callback(on_move)
     cube.set_solve_callback(on_solve)
     
+    def on_signal():
+        print("Stopping...")
+        cube.stop()
+    
+    # Ctrl+C / SIGTERM end run() through stop() instead of unwinding the loop
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, on_signal)
+        except NotImplementedError:  # e.g. Windows event loops
+            pass
+    
     try:
         await cube.run()
-    except KeyboardInterrupt:
-        print("Stopping...")
     finally:
         await cube.disconnect()
 
@@ -2,11 +2,19 @@
 # Copyright (c) 2025 Paul Shapiro
 from __future__ import annotations
 import json, re
+import logging
+import struct
 import time
+from functools import lru_cache
 from typing import List, Tuple, Dict, Optional, NamedTuple
 from dataclasses import dataclass
 from lzstring import LZString
 from Crypto.Cipher import AES
+from Crypto.Util.strxor import strxor
+
+# Per-packet diagnostics go through logging with lazy %-formatting, so
+# nothing is formatted unless the level is enabled.
+logger = logging.getLogger(__name__)
 
 # Source: https://github.com/afedotov/gan-web-bluetooth/blob/master/src/gan.js
 # De-obfuscated, then ported to Python. The lzstring decompression was failing,
@@ -22,6 +30,17 @@ _DECODED_KEYS = [
 FACE_NAMES = ['U', 'R', 'F', 'D', 'L', 'B']
 MOVE_NAMES = ['U', 'R', 'F', 'D', 'L', 'B', "U'", "R'", "F'", "D'", "L'", "B'"]
 
+# Gen3 face bits -> index into FACE_NAMES (JavaScript face map [2, 32, 8, 1, 16, 4]);
+# 0xFF marks bit patterns that aren't a face
+_FACE_LUT = bytearray(b'\xff' * 64)
+for _index, _bits in enumerate((2, 32, 8, 1, 16, 4)):
+    _FACE_LUT[_bits] = _index
+_FACE_LUT = bytes(_FACE_LUT)
+del _index, _bits
+
+# Gen3 move fields from byte 3: LE u32 timestamp, LE u16 serial, direction/face byte
+_GEN3_MOVE_FIELDS = struct.Struct('<IHB')
+
 # Solved state constant - standard color arrangement (URFDLB)
 # Used for detecting when the cube returns to the factory solved state
 SOLVED_STATE = "UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB"
@@ -77,6 +96,12 @@ class CubeMove:
             'cube_timestamp': self.cube_timestamp
         }
 
+# Solved-state reference lists, built once for CubeState.is_solved()
+_SOLVED_CP = list(range(8))
+_SOLVED_CO = [0] * 8
+_SOLVED_EP = list(range(12))
+_SOLVED_EO = [0] * 12
+
 @dataclass
 class CubeState:
     """Represents the complete cube state."""
@@ -101,10 +126,10 @@ class CubeState:
     
     def is_solved(self) -> bool:
         """Check if the cube is in solved state."""
-        return (self.CP == list(range(8)) and
-                self.CO == [0] * 8 and
-                self.EP == list(range(12)) and
-                self.EO == [0] * 12)
+        return (self.CP == _SOLVED_CP and
+                self.CO == _SOLVED_CO and
+                self.EP == _SOLVED_EP and
+                self.EO == _SOLVED_EO)
 
 @dataclass
 class CubeEvent:
@@ -167,12 +192,20 @@ class SolvedEvent(CubeEvent):
         super().__init__(timestamp or time.time(), "SOLVED")
         self.serial = serial
 
+# Base key and IV from JavaScript GAN_ENCRYPTION_KEYS[0]
+_BASE_KEY = bytes([0x01, 0x02, 0x42, 0x28, 0x31, 0x91, 0x16, 0x07, 0x20, 0x05, 0x18, 0x54, 0x42, 0x11, 0x12, 0x53])
+_BASE_IV = bytes([0x11, 0x03, 0x32, 0x28, 0x21, 0x01, 0x76, 0x27, 0x20, 0x95, 0x78, 0x14, 0x32, 0x12, 0x02, 0x43])
+
+def _salted(base: bytes, salt: bytes) -> bytes:
+    """Add the 6-byte salt into the head of ``base`` (mod 0xFF, as the JS does)."""
+    return bytes([(b + s) % 0xFF for b, s in zip(base, salt)]) + base[len(salt):]
+
+@lru_cache(maxsize=4)
 def derive_key_iv(mac_address: str) -> Tuple[bytes, bytes]:
-    """Derive AES key and IV from MAC address (salt-based approach matching JavaScript)."""
-    # Base key and IV from JavaScript GAN_ENCRYPTION_KEYS[0]
-    base_key = bytes([0x01, 0x02, 0x42, 0x28, 0x31, 0x91, 0x16, 0x07, 0x20, 0x05, 0x18, 0x54, 0x42, 0x11, 0x12, 0x53])
-    base_iv = bytes([0x11, 0x03, 0x32, 0x28, 0x21, 0x01, 0x76, 0x27, 0x20, 0x95, 0x78, 0x14, 0x32, 0x12, 0x02, 0x43])
-    
+    """Derive AES key and IV from MAC address (salt-based approach matching JavaScript).
+
+    Memoized: reconnects to the same cube reuse the derived pair.
+    """
     # Extract MAC bytes as salt (handle both MAC and UUID formats)
     # BREAKTHROUGH: This specific GAN356 i Carry 2 variant uses FIRST 12 chars of UUID, not last 12!
     mac_clean = mac_address.replace(':', '').replace('-', '').upper()
@@ -191,15 +224,10 @@ def derive_key_iv(mac_address: str) -> Tuple[bytes, bytes]:
     salt = salt[::-1]
     
     # Apply salt to first 6 bytes of key and IV (matching JavaScript exactly)
-    key = bytearray(base_key)
-    iv = bytearray(base_iv)
-    for i in range(6):
-        key[i] = (base_key[i] + salt[i]) % 0xFF
-        iv[i] = (base_iv[i] + salt[i]) % 0xFF
-    
-    return bytes(key), bytes(iv)
+    return _salted(_BASE_KEY, salt), _salted(_BASE_IV, salt)
 
-def _aes(key: bytes) -> AES:  # AES‑128 ECB helper
+@lru_cache(maxsize=8)
+def _aes(key: bytes) -> AES:  # AES‑128 ECB helper, one key schedule per key
     if len(key) != 16:
         raise ValueError("Key must be 16 bytes")
     return AES.new(key, AES.MODE_ECB)
@@ -216,25 +244,27 @@ def decrypt_packet(raw: bytes, key: bytes, iv: bytes) -> bytes:
     if len(raw) < 16:
         raise ValueError('Data must be at least 16 bytes long')
     
-    # Create a copy to decrypt in-place
-    result = bytearray(raw)
-    
     # JavaScript decrypts the **last** 16-byte block first, then the first.
     # The IV is reused for both decryptions, matching gan-web-bluetooth.
-
-    # 1. Decrypt trailing 16-byte chunk (if present)
-    if len(result) > 16:
-        end_offset = len(result) - 16
-        cipher = AES.new(key, AES.MODE_CBC, iv)
-        chunk = cipher.decrypt(result[end_offset:end_offset + 16])
-        result[end_offset:end_offset + 16] = chunk
-
-    # 2. Decrypt leading 16-byte chunk
-    cipher = AES.new(key, AES.MODE_CBC, iv)
-    chunk = cipher.decrypt(result[0:16])
-    result[0:16] = chunk
-    
-    return bytes(result)
+    # Each is a single-block CBC, i.e. D(block) XOR IV, so one cached ECB
+    # cipher serves every packet instead of a fresh key schedule per block.
+    # The result is assembled from slices rather than patched into a copy.
+    ecb = _aes(key)
+    n = len(raw)
+    if n == 16:
+        return strxor(ecb.decrypt(raw), iv)
+
+    # 1. Decrypt trailing 16-byte chunk
+    tail = strxor(ecb.decrypt(raw[-16:]), iv)
+
+    # 2. Decrypt leading 16-byte chunk.  Below 32 bytes the blocks overlap,
+    #    so the head block already contains the start of the decrypted tail.
+    if n < 32:
+        overlap = 32 - n
+        head = strxor(ecb.decrypt(raw[:16 - overlap] + tail[:overlap]), iv)
+        return head + tail[overlap:]
+    head = strxor(ecb.decrypt(raw[:16]), iv)
+    return head + raw[16:-16] + tail
 
 def encrypt_packet(data: bytes, key: bytes, iv: bytes) -> bytes:
     """Encrypt a command packet using JavaScript-matching dual-chunk approach.
@@ -253,18 +283,16 @@ def encrypt_packet(data: bytes, key: bytes, iv: bytes) -> bytes:
     
     # JavaScript encrypts the **first** 16-byte block first, then the last.
     # The IV is reused for both encryptions, matching gan-web-bluetooth.
+    # Single-block CBC is E(block XOR IV), done with the cached ECB cipher.
+    ecb = _aes(key)
 
     # 1. Encrypt leading 16-byte chunk
-    cipher = AES.new(key, AES.MODE_CBC, iv)
-    chunk = cipher.encrypt(result[0:16])
-    result[0:16] = chunk
+    result[0:16] = ecb.encrypt(strxor(result[0:16], iv))
 
     # 2. Encrypt trailing 16-byte chunk (if present)
     if len(result) > 16:
         end_offset = len(result) - 16
-        cipher = AES.new(key, AES.MODE_CBC, iv)
-        chunk = cipher.encrypt(result[end_offset:end_offset + 16])
-        result[end_offset:end_offset + 16] = chunk
+        result[end_offset:] = ecb.encrypt(strxor(result[end_offset:], iv))
 
     return bytes(result)
 
@@ -272,8 +300,10 @@ class ProtocolMessageView:
     """Binary view helper that allows reading arbitrary bit-length words from a byte sequence (similar to JS GanProtocolMessageView)."""
 
     def __init__(self, message: bytes):
-        # Pre-compute full bit string once – faster than repeated bin() calls later on.
-        self._bits = ''.join(f'{b:08b}' for b in message)
+        # Hold the whole message as one big-endian integer; each field is then
+        # a single shift and mask instead of bit-string slicing.
+        self._value = int.from_bytes(message, 'big')
+        self._nbits = len(message) * 8
 
     def get_bit_word(self, start_bit: int, bit_length: int, little_endian: bool = False) -> int:
         """Return the integer represented by `bit_length` bits starting at `start_bit`.
@@ -284,26 +314,15 @@ class ProtocolMessageView:
         if bit_length <= 0:
             raise ValueError("bit_length must be positive")
         end_bit = start_bit + bit_length
-        if end_bit > len(self._bits):
+        if end_bit > self._nbits:
             raise ValueError("Requested bits exceed message length")
 
-        # For <=8 bits we can slice directly.
-        if bit_length <= 8:
-            return int(self._bits[start_bit:end_bit], 2)
+        value = (self._value >> (self._nbits - end_bit)) & ((1 << bit_length) - 1)
 
         # For 16/32 bits replicate JS behaviour with optional little endian.
-        if bit_length in (16, 32):
-            # Collect bytes (big-endian bit order in _bits string)
-            byte_values = [int(self._bits[i:i+8], 2) for i in range(start_bit, end_bit, 8)]
-            if little_endian:
-                byte_values.reverse()
-            value = 0
-            for b in byte_values:
-                value = (value << 8) | b
-            return value
-
-        # Generic (rare) path – just parse as big-endian bit string.
-        return int(self._bits[start_bit:end_bit], 2)
+        if little_endian and bit_length in (16, 32):
+            return int.from_bytes(value.to_bytes(bit_length // 8, 'big'), 'little')
+        return value
 
 def is_move_packet(clear: bytes) -> bool:
     """Heuristically decide if a decrypted Gen-2/3 packet contains move data."""
@@ -320,10 +339,7 @@ def is_move_packet(clear: bytes) -> bool:
             return False
         # Keep header and type bytes so downstream bit positions match
 
-    # Legacy / header-stripped checks
-    if len(clear) < 16:
-        return False
-
+    # Legacy / header-stripped checks.
     # At least 16 bytes required for any valid packet we parse
     if len(clear) < 16:
         return False
@@ -332,15 +348,13 @@ def is_move_packet(clear: bytes) -> bool:
     # Handle both 16-byte and 18-byte 0x01 packets
     if clear[1] == 0x01 and len(clear) >= 16:
         try:
-            view = ProtocolMessageView(clear)
-            face_bits = view.get_bit_word(74, 6)  # Face at bit 74 (6 bits)
-            face_map = [2, 32, 8, 1, 16, 4]  # JavaScript face mapping
-            is_valid_move = face_bits in face_map
+            face_bits = clear[9] & 0x3F  # Face at bit 74 (6 bits)
+            is_valid_move = _FACE_LUT[face_bits] != 0xFF
             if not is_valid_move:
-                print(f"❓ Unknown face bits: 0x{face_bits:02x} (len={len(clear)})")
+                logger.debug("❓ Unknown face bits: 0x%02x (len=%d)", face_bits, len(clear))
             return is_valid_move
         except Exception as e:
-            print(f"❌ Error checking move packet: {e}")
+            logger.error("❌ Error checking move packet: %s", e)
             return False
     
     # No other packet types are moves
@@ -397,29 +411,22 @@ def parse_move_enhanced(clear: bytes) -> CubeMove:
     
     # JavaScript-style parsing for 16-byte packets (event type 0x01)
     if clear[1] == 0x01 and len(clear) == 16:
-        view = ProtocolMessageView(clear)
-        
-        # Extract direction and face using JavaScript bit positions
-        direction = view.get_bit_word(72, 2)  # Direction at bit 72 (2 bits)
-        face_bits = view.get_bit_word(74, 6)  # Face at bit 74 (6 bits)
+        # Timestamp (bits 24-55), serial (bits 56-71) and the direction/face byte
+        cube_timestamp, serial, move_byte = _GEN3_MOVE_FIELDS.unpack_from(clear, 3)
+        direction = move_byte >> 6  # Direction at bit 72 (2 bits)
+        face_bits = move_byte & 0x3F  # Face at bit 74 (6 bits)
         
         # JavaScript face mapping: [2, 32, 8, 1, 16, 4] -> [U, R, F, D, L, B]
-        face_map = [2, 32, 8, 1, 16, 4]
-        try:
-            face = face_map.index(face_bits)
-            face_char = "URFDLB"[face]
-            direction_char = " '"[direction] if direction < 2 else "?"
-            move_str = (face_char + direction_char).strip()
-            
-            # Extract serial and timestamp
-            cube_timestamp = view.get_bit_word(24, 32, little_endian=True)
-            serial = view.get_bit_word(56, 16, little_endian=True)
-            
-            return CubeMove(face=face, direction=direction, move=move_str,
-                            serial=serial, local_timestamp=time.time(), cube_timestamp=cube_timestamp)
-        except ValueError:
-            print(f"❓ Unknown face bits: 0x{face_bits:02x}")
+        face = _FACE_LUT[face_bits]
+        if face == 0xFF:
+            logger.debug("❓ Unknown face bits: 0x%02x", face_bits)
             return None
+        face_char = "URFDLB"[face]
+        direction_char = " '"[direction] if direction < 2 else "?"
+        move_str = (face_char + direction_char).strip()
+        
+        return CubeMove(face=face, direction=direction, move=move_str,
+                        serial=serial, local_timestamp=time.time(), cube_timestamp=cube_timestamp)
 
     # Special simple-table parsing for variant that uses eventType 0x02 with move byte
     if clear[1] == 0x02:
@@ -440,66 +447,62 @@ def parse_move_enhanced(clear: bytes) -> CubeMove:
         return CubeMove(face=face, direction=direction, move=move_str,
                         serial=serial, local_timestamp=time.time(), cube_timestamp=None)
 
-    # Use ProtocolMessageView for standard Gen3 bit-field extraction
-    view = ProtocolMessageView(clear)
-
-    # Attempt to parse using canonical JS bit positions
-    serial = view.get_bit_word(56, 16, little_endian=True)
-    direction = view.get_bit_word(72, 2)
-    face_bits = view.get_bit_word(74, 6)
+    # Attempt to parse using canonical JS bit positions (all byte aligned:
+    # serial is bits 56-71 little endian, direction/face share byte 9)
+    _, serial, move_byte = _GEN3_MOVE_FIELDS.unpack_from(clear, 3)
+    direction = move_byte >> 6
+    face_bits = move_byte & 0x3F
 
     # If face_bits come back zero, try a fallback: reverse decrypted bytes (excluding 0x55 header) and parse again.
     if face_bits == 0:
         reversed_clear = clear[0:1] + clear[:0:-1]  # keep header byte 0x55 at front, reverse the rest
-        view_rev = ProtocolMessageView(reversed_clear)
-        serial_rev = view_rev.get_bit_word(56, 16, little_endian=True)
-        direction_rev = view_rev.get_bit_word(72, 2)
-        face_bits_rev = view_rev.get_bit_word(74, 6)
-        if face_bits_rev in [1,2,4,8,16,32]:
-            print("🔁 Byte-reversed parsing produced valid face bits")
+        _, serial_rev, move_byte = _GEN3_MOVE_FIELDS.unpack_from(reversed_clear, 3)
+        direction_rev = move_byte >> 6
+        face_bits_rev = move_byte & 0x3F
+        if _FACE_LUT[face_bits_rev] != 0xFF:
+            logger.debug("🔁 Byte-reversed parsing produced valid face bits")
             clear = reversed_clear
-            view = view_rev
             serial = serial_rev
             direction = direction_rev
             face_bits = face_bits_rev
 
     # Validate face_bits
-    if face_bits not in [2,32,8,1,16,4]:
+    face = _FACE_LUT[face_bits]
+    if face == 0xFF:
         raise ValueError(f"Invalid face bits 0x{face_bits:02x}")
 
-    face = [2,32,8,1,16,4].index(face_bits)
     move_str = FACE_NAMES[face] + ("'" if direction == 1 else "")
 
-    print(f"🔍 Parsed JS mapping: serial={serial}, face={FACE_NAMES[face]}, dir={direction}")
+    logger.debug("🔍 Parsed JS mapping: serial=%s, face=%s, dir=%s", serial, FACE_NAMES[face], direction)
 
     if face_bits == 0:
-        # Try some other common positions
+        # Try some other common positions (generic bit extraction only here)
+        view = ProtocolMessageView(clear)
         alt_positions = [(24, 6), (32, 6), (40, 6), (48, 6), (64, 6), (80, 6)]
         for bit_pos, bit_len in alt_positions:
             test_face_bits = view.get_bit_word(bit_pos, bit_len)
-            if test_face_bits in [1, 2, 4, 8, 16, 32]:  # Valid face bit patterns
-                print(f"🔍 Found valid face_bits=0x{test_face_bits:02x} at bit position {bit_pos}")
+            if _FACE_LUT[test_face_bits] != 0xFF:  # Valid face bit patterns
+                logger.debug("🔍 Found valid face_bits=0x%02x at bit position %d", test_face_bits, bit_pos)
                 face_bits = test_face_bits
                 # Also try to find direction at nearby positions
                 for dir_offset in [-2, -1, 1, 2]:
                     test_direction = view.get_bit_word(bit_pos + dir_offset, 2)
                     if test_direction in [0, 1]:  # Valid direction values
                         direction = test_direction
-                        print(f"🔍 Found direction={direction} at bit position {bit_pos + dir_offset}")
+                        logger.debug("🔍 Found direction=%s at bit position %d", direction, bit_pos + dir_offset)
                         break
                 break
     
     # Debug logging
-    print(f"🔍 Parsed: serial={serial}, direction={direction}, face_bits=0x{face_bits:02x}")
+    logger.debug("🔍 Parsed: serial=%s, direction=%s, face_bits=0x%02x", serial, direction, face_bits)
     
     # JavaScript face mapping: [2, 32, 8, 1, 16, 4] maps to "URFDLB"
-    face_map = [2, 32, 8, 1, 16, 4]
-    try:
-        face = face_map.index(face_bits)  # This gives us index into "URFDLB"
-        print(f"🔍 Face mapped: face_bits=0x{face_bits:02x} -> face={face} ({FACE_NAMES[face]})")
-    except ValueError:
+    face = _FACE_LUT[face_bits]  # This gives us index into "URFDLB"
+    if face != 0xFF:
+        logger.debug("🔍 Face mapped: face_bits=0x%02x -> face=%d (%s)", face_bits, face, FACE_NAMES[face])
+    else:
         # Fallback if face_bits doesn't match expected values
-        print(f"⚠️ Unknown face_bits: 0x{face_bits:02x}, using fallback")
+        logger.warning("⚠️ Unknown face_bits: 0x%02x, using fallback", face_bits)
         face = 0  # Default to U
     
     # Create move string notation
@@ -545,99 +548,6 @@ def parse_move(clear: bytes) -> Dict:
             "move": face_name + ("'" if move_byte % 2 == 1 else "")
         }
 
-# ---------------- Cube state ↔ facelets helpers ----------------
-CORNER_FACELET_MAP = [
-    (8, 9, 20),   # URF
-    (6, 18, 38),  # UFL
-    (0, 36, 47),  # ULB
-    (2, 45, 11),  # UBR
-    (29, 26, 15), # DFR
-    (27, 44, 24), # DLF
-    (33, 53, 42), # DBL
-    (35, 17, 51), # DRB
-]
-
-EDGE_FACELET_MAP = [
-    (5, 10),   # UR
-    (7, 19),   # UF
-    (3, 37),   # UL
-    (1, 46),   # UB
-    (32, 16),  # DR
-    (28, 25),  # DF
-    (30, 43),  # DL
-    (34, 52),  # DB
-    (23, 12),  # FR
-    (21, 41),  # FL
-    (50, 39),  # BL
-    (48, 14),  # BR
-]
-
-FACES_ORDER = "URFDLB"
-
-def to_kociemba_facelets(cp: List[int], co: List[int], ep: List[int], eo: List[int]) -> str:
-    """Convert CP/CO/EP/EO arrays to 54-char facelet string (same as JS utils.toKociembaFacelets)."""
-    facelets: List[str] = [FACES_ORDER[i // 9] for i in range(54)]
-
-    # Corners
-    for i in range(8):
-        for p in range(3):
-            facelets[CORNER_FACELET_MAP[i][(p + co[i]) % 3]] = FACES_ORDER[CORNER_FACELET_MAP[cp[i]][p] // 9]
-
-    # Edges
-    for i in range(12):
-        for p in range(2):
-            facelets[EDGE_FACELET_MAP[i][(p + eo[i]) % 2]] = FACES_ORDER[EDGE_FACELET_MAP[ep[i]][p] // 9]
-
-    return ''.join(facelets)
-
-# ---------------- Facelets packet parsing (Gen3) ----------------
-
-def _sum(arr: List[int]) -> int:
-    return sum(arr)
-
-def parse_facelets_event(clear: bytes) -> Optional[FaceletsEvent]:
-    """Parse Gen3 FACELETS event (magic 0x55, eventType 0x02)."""
-    if len(clear) < 20 or clear[0] != 0x55:
-        return None
-
-    # Event type byte is second (index 1)
-    if clear[1] != 0x02:
-        return None
-
-    view = ProtocolMessageView(clear)
-
-    # Serial is 16-bit little-endian starting at bit 24
-    serial = view.get_bit_word(24, 16, little_endian=True)
-
-    # Parse CP/CO/EP/EO according to JS GanGen3ProtocolDriver
-    cp: List[int] = []
-    co: List[int] = []
-    ep: List[int] = []
-    eo: List[int] = []
-
-    # Corners 0-6 (3 bits each) start at bit 40, stride 3
-    for i in range(7):
-        cp.append(view.get_bit_word(40 + i * 3, 3))
-        co.append(view.get_bit_word(61 + i * 2, 2))
-    cp.append(28 - _sum(cp))
-    co.append((3 - (_sum(co) % 3)) % 3)
-
-    # Edges 0-10 (4 bits each) start at bit 77, stride 4
-    for i in range(11):
-        ep.append(view.get_bit_word(77 + i * 4, 4))
-        eo.append(view.get_bit_word(121 + i, 1))
-    ep.append(66 - _sum(ep))
-    eo.append((2 - (_sum(eo) % 2)) % 2)
-
-    state = CubeState(CP=cp, CO=co, EP=ep, EO=eo)
-    facelets = to_kociemba_facelets(cp, co, ep, eo)
-
-    return FaceletsEvent(
-        serial=serial,
-        facelets=facelets,
-        state=state
-    )
-
 def parse_battery_event(clear: bytes) -> Optional[BatteryEvent]:
     """Parse a battery level event from decrypted packet."""
     if len(clear) < 4:
@@ -660,7 +570,7 @@ def parse_hardware_event(packet: bytes) -> Optional[HardwareEvent]:
         return HardwareEvent()
         
     except Exception as e:
-        print(f"❌ Error parsing hardware event: {e}")
+        logger.error("❌ Error parsing hardware event: %s", e)
         return None
 
 def parse_facelets_event(clear: bytes) -> Optional[FaceletsEvent]:
@@ -688,7 +598,7 @@ def parse_facelets_event(clear: bytes) -> Optional[FaceletsEvent]:
         )
         
     except Exception as e:
-        print(f"❌ Error parsing facelets event: {e}")
+        logger.error("❌ Error parsing facelets event: %s", e)
         return None
 
 def extract_facelets_from_packet(clear: bytes) -> str:
@@ -792,5 +702,5 @@ def parse_solved_event(packet: bytes) -> Optional[SolvedEvent]:
         return SolvedEvent(serial=serial)
         
     except Exception as e:
-        print(f"❌ Error parsing solved event: {e}")
+        logger.error("❌ Error parsing solved event: %s", e)
         return None
@@ -8,6 +8,7 @@ based on the gan-web-bluetooth JavaScript implementation.
 
 from __future__ import annotations
 import asyncio
+import os
 import time
 from typing import List, Dict, Optional, Callable, Any
 from collections import deque
@@ -19,16 +20,20 @@ try:
         CubeMove, CubeEvent, MoveEvent, FaceletsEvent, BatteryEvent, HardwareEvent, SolvedEvent,
         CubeState, parse_move_enhanced, parse_facelets_event, parse_battery_event,
         parse_hardware_event, parse_solved_event, is_solved_packet, decrypt_packet,
-        is_move_packet, is_solved_state
+        encrypt_packet, is_move_packet, is_solved_state
     )
 except ImportError:
     from gan_decrypt import (
         CubeMove, CubeEvent, MoveEvent, FaceletsEvent, BatteryEvent, HardwareEvent, SolvedEvent,
         CubeState, parse_move_enhanced, parse_facelets_event, parse_battery_event,
         parse_hardware_event, parse_solved_event, is_solved_packet, decrypt_packet,
-        is_move_packet, is_solved_state
+        encrypt_packet, is_move_packet, is_solved_state
     )
 
+# Hex dumps of packets/commands in the log.  Set CUBE_VERBOSE=0 to skip the
+# per-packet hex encoding on collection-only or long-running sessions.
+VERBOSE = os.environ.get("CUBE_VERBOSE", "1") == "1"
+
 
 class GanProtocolDriver(ABC):
     """Base class for GAN cube protocol drivers."""
@@ -75,7 +80,8 @@ class GanGen3ProtocolDriver(GanProtocolDriver):
             # Gen3 reset command from JavaScript implementation
             reset_cmd = bytes([0x68, 0x05, 0x05, 0x39, 0x77, 0x00, 0x00, 0x01, 
                               0x23, 0x45, 0x67, 0x89, 0xAB, 0x00, 0x00, 0x00])
-            print(f"🔧 DEBUG: Creating reset command: {reset_cmd.hex()}")
+            if VERBOSE:
+                print(f"🔧 DEBUG: Creating reset command: {reset_cmd.hex()}")
             return reset_cmd
         
         return None
@@ -238,23 +244,20 @@ class GanGen3ProtocolDriver(GanProtocolDriver):
             return events
         
         # Extract packet type from byte 1 (JavaScript: eventType = msg.getBitWord(8, 8))
-        packet_type = event_message[1] if len(event_message) > 1 else 0
-        magic_byte = event_message[0] if len(event_message) > 0 else 0
+        packet_type = event_message[1]
+        magic_byte = event_message[0]
         
         try:
-            # Import here to avoid circular imports
-            try:
-                from .gan_decrypt import is_move_packet
-            except ImportError:
-                from gan_decrypt import is_move_packet
-            
-            # First attempt to parse as Gen3 facelets event (may be >16 bytes)
-            facelets_evt = parse_facelets_event(event_message)
-            if facelets_evt:
-                events.append(facelets_evt)
-                await self.check_if_move_missed(conn)
+            # First attempt to parse as Gen3 facelets event (may be >16 bytes);
+            # only 0x02 packets can be facelets, so skip the call for the rest
+            if packet_type == 0x02:
+                facelets_evt = parse_facelets_event(event_message)
+                if facelets_evt:
+                    events.append(facelets_evt)
+                    await self.check_if_move_missed(conn)
 
-            if is_move_packet(event_message):
+            # Only 0x01 packets can be moves
+            if packet_type == 0x01 and is_move_packet(event_message):
                 move = parse_move_enhanced(event_message)
                 if move:
                     # Check for duplicate serial numbers (like JavaScript implementation)
@@ -282,23 +285,26 @@ class GanGen3ProtocolDriver(GanProtocolDriver):
                 if facelets_event:
                     events.append(facelets_event)
                     
-                    # DEBUG: Log facelets string and solved state check
-                    print(f"🔍 DEBUG: Full facelets: {facelets_event.facelets}")
+                    # DEBUG: Log facelets string and solved state check.
+                    # Collected and printed in one write per packet.
                     current_solved_state = is_solved_state(facelets_event.facelets)
-                    print(f"🔍 DEBUG: is_solved_state() = {current_solved_state}, last_solved = {getattr(self, 'last_solved_state', None)}")
-                    
-                    # Only emit solved event if state changed from not-solved to solved
-                    print(f"🔍 DEBUG: Checking solve transition: current={current_solved_state}, last={self.last_solved_state}")
-                    print(f"🔍 DEBUG: Condition check: current_solved_state={current_solved_state}, last_solved_state != True = {self.last_solved_state != True}")
-                    print(f"🔍 DEBUG: Overall condition: {current_solved_state and self.last_solved_state != True}")
+                    debug_lines = [
+                        f"🔍 DEBUG: Full facelets: {facelets_event.facelets}",
+                        f"🔍 DEBUG: is_solved_state() = {current_solved_state}, last_solved = {getattr(self, 'last_solved_state', None)}",
+                        # Only emit solved event if state changed from not-solved to solved
+                        f"🔍 DEBUG: Checking solve transition: current={current_solved_state}, last={self.last_solved_state}",
+                        f"🔍 DEBUG: Condition check: current_solved_state={current_solved_state}, last_solved_state != True = {self.last_solved_state != True}",
+                        f"🔍 DEBUG: Overall condition: {current_solved_state and self.last_solved_state != True}",
+                    ]
                     
                     if current_solved_state and self.last_solved_state != True:
-                        print("🎉 Cube solved! Creating SolvedEvent")
+                        debug_lines.append("🎉 Cube solved! Creating SolvedEvent")
                         solved_event = SolvedEvent(serial=facelets_event.serial, timestamp=time.time())
                         events.append(solved_event)
-                        print(f"🔍 DEBUG: SolvedEvent created and added to events list (total events: {len(events)})")
+                        debug_lines.append(f"🔍 DEBUG: SolvedEvent created and added to events list (total events: {len(events)})")
                     else:
-                        print(f"🚫 DEBUG: No solve event - condition not met")
+                        debug_lines.append("🚫 DEBUG: No solve event - condition not met")
+                    print("\n".join(debug_lines))
                     
                     # Update tracked solved state
                     self.last_solved_state = current_solved_state
@@ -329,17 +335,20 @@ class GanGen3ProtocolDriver(GanProtocolDriver):
                         
             else:
                 # Debug: Log unknown packets with full details for analysis
-                packet_hex = event_message.hex()
-                print(f"❓ Unknown packet type: len={len(event_message)}, type=0x{packet_type:02x}, magic=0x{magic_byte:02x}")
-                print(f"   Packet: {packet_hex}")
+                report = f"❓ Unknown packet type: len={len(event_message)}, type=0x{packet_type:02x}, magic=0x{magic_byte:02x}"
+                if VERBOSE:
+                    report += f"\n   Packet: {event_message.hex()}"
                 
                 # Check if this might be a solved state or special event
                 if magic_byte == 0x55:
-                    print(f"   Valid magic byte - may be special event type 0x{packet_type:02x}")
+                    report += f"\n   Valid magic byte - may be special event type 0x{packet_type:02x}"
+                print(report)
 
         except Exception as e:
-            print(f"❌ Error parsing event: {e}")
-            print(f"   Packet: {event_message.hex()}")
+            if VERBOSE:
+                print(f"❌ Error parsing event: {e}\n   Packet: {event_message.hex()}")
+            else:
+                print(f"❌ Error parsing event: {e}")
         
         return events
 
@@ -442,9 +451,9 @@ class GanCubeConnection:
         if cmd_message:
             # Encrypt the command before sending
             if self._key and self._iv:
-                from gan_decrypt import encrypt_packet
                 encrypted_message = encrypt_packet(cmd_message, self._key, self._iv)
-                print(f"🔐 DEBUG: Encrypted command: {encrypted_message.hex()}")
+                if VERBOSE:
+                    print(f"🔐 DEBUG: Encrypted command: {encrypted_message.hex()}")
                 await self._raw_connection.send_command_message(encrypted_message)
             else:
                 print("⚠️ WARNING: No encryption keys available, sending raw command")
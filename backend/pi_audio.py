@@ -6,41 +6,128 @@ Raspberry Pi Audio Handler for Alarm Clock
 Handles local audio playback on Raspberry Pi with fallback options.
 """
 
+import asyncio
+import concurrent.futures
+import functools
+import importlib.util
 import os
 import subprocess
 import threading
 import time
 import logging
 import re
+import shutil
+import signal
+import wave
 from typing import Optional, Dict, Tuple
 import platform
 
 logger = logging.getLogger(__name__)
 
+# Shared write-only handle on /dev/null for discarding child output.  Popen
+# accepts a raw fd and never closes it, so opening it once avoids an
+# open()/close() pair per stream on every playback.
+_DEVNULL_FD = os.open(os.devnull, os.O_WRONLY)
+
+# ALSA buffer/period sizes for aplay, in microseconds.  The defaults give a
+# 50 ms buffer split into four periods; slower boards (e.g. Pi Zero) that
+# underrun can raise them through the environment.
+ALSA_BUFFER_US = int(os.environ.get('ALSA_BUFFER_US', 50000))
+ALSA_PERIOD_US = int(os.environ.get('ALSA_PERIOD_US', 12500))
+
+# Escalation used when stopping playback: (signal, seconds to wait for exit).
+# aplay handles SIGINT promptly and closes the PCM cleanly, so it goes first.
+_STOP_SIGNALS = (
+    (signal.SIGINT, 0.3),
+    (signal.SIGTERM, 1.0),
+    (signal.SIGKILL, None),
+)
+
+# Upper bound for a synchronous stop_alarm_sound() call: the escalation above
+# plus the wait for the alarm task, with slack for a slow board.
+_STOP_TIMEOUT = 10
+
+# Minimum length of the looped PCM buffer handed to aplay per write, so short
+# alarm tones don't wake the feeder for every repeat.
+_PCM_LOOP_SECONDS = 10
+
+# WAV sample width in bytes -> aplay raw sample format
+_APLAY_FORMATS = {1: 'U8', 2: 'S16_LE', 3: 'S24_3LE', 4: 'S32_LE'}
+
+class AlarmState:
+    """Everything the audio loop tracks for one playing alarm.
+
+    A plain class with hand-written ``__slots__``: ``dataclass(slots=True)``
+    needs Python 3.10, and Raspberry Pi OS Bullseye ships 3.9.
+    """
+    __slots__ = ('stop_event', 'task', 'process', 'pgid', 'feeder')
+
+    def __init__(self):
+        self.stop_event = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.pgid: Optional[int] = None  # only for processes started in their own session
+        self.feeder: Optional[asyncio.Task] = None
+
 class PiAudioManager:
     """Manages audio playback on Raspberry Pi with multiple fallback options."""
     
     def __init__(self):
-        self.active_alarms: Dict[str, threading.Thread] = {}
-        self.active_processes: Dict[str, subprocess.Popen] = {}
-        self.stop_events: Dict[str, threading.Event] = {}  # alarm_id -> subprocess.Popen object
+        self._alarms: Dict[str, AlarmState] = {}
+        self._beep_cache: Dict[Tuple[int, float, int], object] = {}  # (freq, duration, rate) -> sample array
+        self._sound_cache: Dict[str, object] = {}  # sound file -> pygame.mixer.Sound
+        self._pcm_cache: Dict[str, Tuple[str, int, int, bytes, bytes]] = {}  # sound file -> decoded aplay input
+        self._sound_env = os.environ.get('ALARM_SOUND_FILE')
+        self._resolved_sound_path = self._resolve_sound_file(self._sound_env)
         self.is_pi = self._detect_raspberry_pi()
         self.audio_method = self._detect_audio_method()
 
         if self.is_pi:
             self.audio_method = 'aplay'
 
+        # Bring the mixer up now so the first alarm doesn't pay for it.
+        if self.audio_method == 'pygame':
+            self._init_pygame_mixer()
+
+        # All alarms share one event loop running on a daemon thread.  Each
+        # alarm is a task parked on an asyncio.Event instead of an OS thread of
+        # its own; the public methods stay synchronous for Flask/scheduler
+        # callers and hand work to the loop.  (Before Python 3.12 asyncio's
+        # default child watcher still parks one waitpid() thread per running
+        # aplay/speaker-test child; the watcher is process-wide, so it is left
+        # alone rather than swapped out per manager.)
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="pi-audio", daemon=True).start()
+
+        # Resolve the playback backend once so each alarm start is a single
+        # table lookup rather than a chain of string comparisons.  Backends
+        # that block until playback finishes run in the loop's executor.
+        self._play_fn = {
+            'pygame': functools.partial(asyncio.to_thread, self._play_pygame),
+            'aplay': self._play_aplay,
+            'paplay': functools.partial(asyncio.to_thread, self._play_paplay),
+            'afplay': functools.partial(asyncio.to_thread, self._play_afplay),
+            'speaker-test': self._play_speaker_test,
+        }.get(self.audio_method, functools.partial(asyncio.to_thread, self._play_none))
+
         # Detect analog ALSA device (card and device numbers) so we can force
         # playback through the headphone jack instead of HDMI.  If detection
         # fails, fall back to card 0, device 0.
         self.alsa_card, self.alsa_device = self._detect_alsa_device()
         self.alsa_output = f"plughw:{self.alsa_card},{self.alsa_device}"
+        self._alsa_env_key = -1
+        self._alsa_env: Dict[str, str] = self._alsa_environ()
 
         logger.info(
             f"🔊 Audio Manager initialized - Platform: {'Pi' if self.is_pi else platform.system()}, Method: {self.audio_method}, ALSA output: {self.alsa_output}"
         )
     
-    def _detect_raspberry_pi(self) -> bool:
+    # The probes below only depend on the host, so their results are cached
+    # for the life of the process and later managers construct for free.
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _detect_raspberry_pi() -> bool:
         """Detect if running on Raspberry Pi."""
         try:
             with open('/proc/cpuinfo', 'r') as f:
@@ -48,52 +135,39 @@ class PiAudioManager:
         except:
             return False
     
-    def _detect_audio_method(self) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _detect_audio_method() -> str:
         """Detect best available audio method."""
-        methods = []
-        
-        # Check for pygame (preferred for Pi)
-        try:
-            import pygame
-            methods.append('pygame')
-        except ImportError:
-            pass
-        
-        # Check for system audio commands
-        if self._command_exists('aplay'):
-            methods.append('aplay')
-        if self._command_exists('paplay'):
-            methods.append('paplay')
-        if self._command_exists('speaker-test'):
-            methods.append('speaker-test')
-        if self._command_exists('afplay'):  # macOS
-            methods.append('afplay')
-        
-        # Return best method
-        if 'pygame' in methods:
-            return 'pygame'
-        elif 'aplay' in methods:
-            return 'aplay'
-        elif 'paplay' in methods:
-            return 'paplay'
-        elif 'afplay' in methods:
-            return 'afplay'
-        elif 'speaker-test' in methods:
-            return 'speaker-test'
-        else:
-            return 'none'
+        # In priority order; stops probing at the first one available.
+        # pygame (preferred for Pi) is only looked up, not imported, since
+        # importing it pulls in SDL.
+        candidates = (
+            ('pygame', lambda: importlib.util.find_spec('pygame') is not None),
+            ('aplay', lambda: PiAudioManager._command_exists('aplay')),
+            ('paplay', lambda: PiAudioManager._command_exists('paplay')),
+            ('afplay', lambda: PiAudioManager._command_exists('afplay')),  # macOS
+            ('speaker-test', lambda: PiAudioManager._command_exists('speaker-test')),
+        )
+        for name, available in candidates:
+            if available():
+                return name
+        return 'none'
     
-    def _command_exists(self, command: str) -> bool:
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _command_exists(command: str) -> bool:
         """Check if a command exists in PATH."""
         try:
             # Use shutil.which instead of subprocess which command
             # This works in systemd environments where 'which' may not be available
-            import shutil
             return shutil.which(command) is not None
         except Exception:
             return False
 
-    def _detect_alsa_device(self) -> Tuple[str, str]:
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _detect_alsa_device() -> Tuple[str, str]:
         """Detect the ALSA card/device numbers for the analog headphone jack.
 
         Returns (card, device) as strings. Defaults to ('0', '0') if detection
@@ -112,45 +186,77 @@ class PiAudioManager:
         except Exception as e:
             logger.debug(f"ALSA device detection failed: {e}")
         return '0', '0'
+
+    @staticmethod
+    def _resolve_sound_file(sound_file: Optional[str] = None) -> Optional[str]:
+        """Return the absolute path of the alarm sound, or None if it is missing.
+
+        Without an explicit file the default lives relative to the project
+        root so that systemd or other launch methods using a different working
+        directory can still locate it.
+        """
+        if not sound_file:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            sound_file = os.path.join(base_dir, 'sounds', 'alarm.wav')
+        sound_file = os.path.abspath(sound_file)
+        return sound_file if os.path.isfile(sound_file) else None
+
+    def _default_sound_path(self) -> Optional[str]:
+        """Cached default sound path; re-resolved only if ALARM_SOUND_FILE changes."""
+        env_path = os.environ.get('ALARM_SOUND_FILE')
+        if env_path != self._sound_env:
+            self._sound_env = env_path
+            self._resolved_sound_path = self._resolve_sound_file(env_path)
+        return self._resolved_sound_path
+
+    def _alsa_environ(self) -> Dict[str, str]:
+        """Environment for aplay: ours minus PulseAudio, pinned to the ALSA device.
+
+        Built once and shared by every spawn; the size of os.environ serves as
+        a cheap check for whether it needs rebuilding.
+        """
+        if len(os.environ) != self._alsa_env_key:
+            self._alsa_env_key = len(os.environ)
+            # Drop PulseAudio variables that conflict with ALSA
+            env = {k: v for k, v in os.environ.items()
+                   if k not in ('PULSE_RUNTIME_PATH', 'PULSE_RUNTIME_DIR')}
+            env['ALSA_PCM_CARD'] = self.alsa_card  # Force ALSA to use detected card
+            env['ALSA_PCM_DEVICE'] = self.alsa_device  # Force ALSA to use detected device
+            self._alsa_env = env
+        return self._alsa_env
+
+    def _run(self, coro, timeout: Optional[float] = None):
+        """Run ``coro`` on the audio event loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
     
     def play_alarm_sound(self, alarm_id: str, sound_file: str = None) -> bool:
         """Play alarm sound continuously until stopped."""
-        logger.info(f"🔊 DEBUG: play_alarm_sound called for ID: {alarm_id}")
-        
-        if alarm_id in self.active_alarms:
+        if alarm_id in self._alarms:
             logger.info(f"🔊 Alarm {alarm_id} already playing")
             return True
             
-        # Resolve the alarm sound path relative to the project root so that
-        # systemd or other launch methods using a different working directory
-        # can still locate the audio file reliably.
+        # A missing file resolves to None and the backends go straight to
+        # their speaker-test/beep fallback.
         if sound_file:
-            sound_path = sound_file
+            sound_path = self._resolve_sound_file(sound_file)
         else:
-            env_path = os.environ.get('ALARM_SOUND_FILE')
-            if env_path:
-                sound_path = env_path
-            else:
-                base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                sound_path = os.path.join(base_dir, 'sounds', 'alarm.wav')
-        logger.info(f"🔊 Starting alarm sound for ID: {alarm_id} with file: {sound_path}")
-        logger.info(f"🔊 DEBUG: Sound file exists: {os.path.exists(sound_path)}")
-        logger.info(f"🔊 DEBUG: Current working directory: {os.getcwd()}")
-        logger.info(f"🔊 DEBUG: Environment variables: PULSE_RUNTIME_PATH={os.environ.get('PULSE_RUNTIME_PATH')}, XDG_RUNTIME_DIR={os.environ.get('XDG_RUNTIME_DIR')}")
-        
-        # Create stop event for this alarm
-        stop_event = threading.Event()
-        self.stop_events[alarm_id] = stop_event
+            sound_path = self._default_sound_path()
+        logger.info("🔊 Starting alarm sound for ID: %s with file: %s", alarm_id, sound_path)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔊 Current working directory: %s", os.getcwd())
+            logger.debug(
+                "🔊 Environment variables: PULSE_RUNTIME_PATH=%s, XDG_RUNTIME_DIR=%s",
+                os.environ.get('PULSE_RUNTIME_PATH'), os.environ.get('XDG_RUNTIME_DIR'),
+            )
         
-        # Create and start alarm thread
-        alarm_thread = threading.Thread(
-            target=self._alarm_sound_loop,
-            args=(alarm_id, alarm_id, sound_path, stop_event),
-            daemon=True
+        return self._run(self._start_alarm(alarm_id, sound_path))
+
+    async def _start_alarm(self, alarm_id: str, sound_path: str) -> bool:
+        """Register the state and playback task for an alarm."""
+        state = self._alarms[alarm_id] = AlarmState()
+        state.task = asyncio.create_task(
+            self._alarm_sound_loop(alarm_id, alarm_id, sound_path, state.stop_event)
         )
-        alarm_thread.start()
-        
-        self.active_alarms[alarm_id] = alarm_thread
         return True
 
     # Backwards compatible wrapper expected by older interfaces
@@ -160,84 +266,93 @@ class PiAudioManager:
     
     def stop_alarm_sound(self, alarm_id: str) -> bool:
         """Stop playing alarm sound for given alarm ID."""
+        try:
+            return self._run(self._stop_alarm_sound(alarm_id), timeout=_STOP_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            # A child that never reports its exit must not hang the caller
+            logger.error(f"❌ Timed out stopping alarm sound for {alarm_id}")
+            return False
+
+    async def _stop_alarm_sound(self, alarm_id: str) -> bool:
+        """Signal the alarm task to finish and terminate its subprocess."""
         logger.info(f"🔇 Stopping alarm sound for: {alarm_id}")
         
-        # Check if we have an active process (even if thread has exited)
-        has_active_process = alarm_id in self.active_processes
-        has_active_thread = alarm_id in self.active_alarms
-        
-        if not has_active_process and not has_active_thread:
+        # The state outlives the task, so a process is still found here even
+        # if the playback task has already exited
+        state = self._alarms.pop(alarm_id, None)
+        if state is None:
             logger.warning(f"⚠️ No alarm sound or process found for {alarm_id}")
             return False
         
         # Set stop event to signal the audio loop to stop
-        if alarm_id in self.stop_events:
-            self.stop_events[alarm_id].set()
+        state.stop_event.set()
         
         # Kill any active subprocess for this alarm
-        if alarm_id in self.active_processes:
-            process = self.active_processes[alarm_id]
+        process = state.process
+        if process is not None:
+            # Processes spawned in their own session lead a process group whose
+            # id is their pid; signal the whole group.  Anything else shares
+            # our group, so only the process itself may be signalled.
+            pgid = state.pgid
             try:
-                logger.info(f"🔇 DEBUG: Terminating process {process.pid} for {alarm_id}")
-                # Kill the entire process group to ensure shell and child processes are terminated
-                import signal
-                try:
-                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-                    logger.info(f"🔇 DEBUG: Sent SIGTERM to process group {process.pid}")
-                except ProcessLookupError:
-                    logger.info(f"🔇 DEBUG: Process group {process.pid} already terminated")
-                
-                # Wait for graceful termination
-                try:
-                    process.wait(timeout=2)
-                    logger.info(f"🔇 DEBUG: Process {process.pid} terminated gracefully")
-                except subprocess.TimeoutExpired:
-                    # Force kill if it doesn't terminate gracefully
+                logger.debug("🔇 Terminating process %s for %s", process.pid, alarm_id)
+                for sig, grace in _STOP_SIGNALS:
                     try:
-                        os.killpg(os.getpgid(process.pid), signal.SIGKILL)
-                        logger.info(f"🔇 DEBUG: Force killed process group {process.pid}")
+                        if pgid is not None:
+                            os.killpg(pgid, sig)
+                        else:
+                            process.send_signal(sig)
                     except ProcessLookupError:
-                        logger.info(f"🔇 DEBUG: Process group {process.pid} already gone")
-                    process.wait()
+                        logger.debug("🔇 Process %s already terminated", process.pid)
+                        break
+                    if grace is None:
+                        await process.wait()
+                        logger.debug("🔇 Force killed process %s", process.pid)
+                        break
+                    try:
+                        await asyncio.wait_for(process.wait(), timeout=grace)
+                        logger.debug("🔇 Process %s exited on %s", process.pid, sig.name)
+                        break
+                    except asyncio.TimeoutError:
+                        continue
             except Exception as e:
                 logger.error(f"❌ Error terminating process for {alarm_id}: {e}")
-            finally:
-                self.active_processes.pop(alarm_id, None)
         
-        # Remove from active alarms and wait for thread to finish
-        thread = self.active_alarms.pop(alarm_id, None)
-        if thread and thread.is_alive():
-            # Thread should exit naturally when stop event is set
-            thread.join(timeout=3)  # Wait up to 3 seconds for thread to finish
-            if thread.is_alive():
-                logger.warning(f"⚠️ Alarm thread for {alarm_id} did not finish gracefully")
+        # The feeder exits on its own once aplay's stdin breaks; cancel in
+        # case it is still parked in drain()
+        if state.feeder:
+            state.feeder.cancel()
         
-        # Clean up stop event
-        self.stop_events.pop(alarm_id, None)
+        # Wait for the task to finish
+        if state.task and not state.task.done():
+            # Task should exit naturally when stop event is set
+            done, _ = await asyncio.wait({state.task}, timeout=3)
+            if not done:
+                logger.warning(f"⚠️ Alarm task for {alarm_id} did not finish gracefully")
         
         return True
     
     def stop_all_alarms(self):
         """Stop all active alarm sounds."""
         logger.info("🔇 Stopping all alarm sounds")
-        alarm_ids = list(self.active_alarms.keys())
+        alarm_ids = list(self._alarms)
         for alarm_id in alarm_ids:
             self.stop_alarm_sound(alarm_id)
     
-    def _alarm_sound_loop(self, alarm_id: str, alarm_label: str, sound_path: str, stop_event: threading.Event):
+    async def _alarm_sound_loop(self, alarm_id: str, alarm_label: str, sound_path: str, stop_event: asyncio.Event):
         """Main alarm sound loop - runs until alarm is stopped."""
         logger.info(f"🎵 Starting alarm sound loop for: {alarm_label}")
         
         try:
             # Start the continuous audio playback
-            success = self._play_alarm_sound_once(sound_path, alarm_id)
+            success = await self._play_alarm_sound_once(sound_path, alarm_id)
             if not success:
                 logger.error(f"❌ Failed to start alarm sound for {alarm_label}")
                 return
             
-            # Wait for stop event while audio plays continuously
-            while not stop_event.is_set():
-                time.sleep(0.1)  # Check for stop every 0.1s
+            # Block until stop_alarm_sound() sets the event; audio keeps
+            # playing in the background subprocess meanwhile.
+            await stop_event.wait()
         
         except Exception as e:
             logger.error(f"❌ Error in alarm sound loop for {alarm_label}: {e}")
@@ -247,39 +362,42 @@ class PiAudioManager:
             # This prevents race condition where stop_alarm_sound can't find the process
             logger.info(f"🔇 Alarm sound loop ended for: {alarm_label}")
     
-    def _play_alarm_sound_once(self, sound_file: str, alarm_id: str = None) -> bool:
+    async def _play_alarm_sound_once(self, sound_file: Optional[str], alarm_id: str = None) -> bool:
         """Play alarm sound once using the best available method."""
         try:
-            if self.audio_method == 'pygame':
-                return self._play_pygame(sound_file)
-            elif self.audio_method == 'aplay':
-                return self._play_aplay(sound_file, alarm_id)
-            elif self.audio_method == 'paplay':
-                return self._play_paplay(sound_file)
-            elif self.audio_method == 'afplay':
-                return self._play_afplay(sound_file)
-            elif self.audio_method == 'speaker-test':
-                return self._play_speaker_test(sound_file, alarm_id)
-            else:
-                logger.error("❌ No audio method available")
-                return self._play_console_beep()
-        
+            return await self._play_fn(sound_file, alarm_id)
         except Exception as e:
             logger.error(f"❌ Error playing alarm sound: {e}")
             return False
     
-    def _play_pygame(self, sound_file: str) -> bool:
-        """Play alarm sound using pygame."""
+    def _play_none(self, sound_file: Optional[str], alarm_id: str = None) -> bool:
+        """Fallback used when no audio backend was detected."""
+        logger.error("❌ No audio method available")
+        return self._play_console_beep()
+
+    def _init_pygame_mixer(self):
+        """Initialize the pygame mixer if it isn't running yet."""
         try:
             import pygame
-            
-            # Initialize pygame mixer if not already done
             if not pygame.mixer.get_init():
                 pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+        except Exception as e:
+            logger.error(f"❌ Pygame mixer init error: {e}")
+
+    def _play_pygame(self, sound_file: Optional[str], alarm_id: str = None) -> bool:
+        """Play alarm sound using pygame."""
+        try:
+            import pygame
+            
+            self._init_pygame_mixer()
             
-            # Check for custom alarm sound file
-            if os.path.exists(sound_file):
+            # Reuse the decoded sound; only hit the disk the first time
+            sound = self._sound_cache.get(sound_file)
+            if sound is None and sound_file:
                 sound = pygame.mixer.Sound(sound_file)
+                self._sound_cache[sound_file] = sound
+            
+            if sound is not None:
                 sound.play()
                 # Wait for sound to finish
                 while pygame.mixer.get_busy():
@@ -305,13 +423,14 @@ class PiAudioManager:
             duration = 1.0
             frequency = 800
             
-            frames = int(duration * sample_rate)
-            arr = np.zeros((frames, 2), dtype=np.int16)
-            
-            for i in range(frames):
-                wave = int(16383 * np.sin(2 * np.pi * frequency * i / sample_rate))
-                arr[i][0] = wave  # Left channel
-                arr[i][1] = wave  # Right channel
+            cache_key = (frequency, duration, sample_rate)
+            arr = self._beep_cache.get(cache_key)
+            if arr is None:
+                frames = int(duration * sample_rate)
+                t = np.arange(frames, dtype=np.float32)
+                wave = (16383 * np.sin(2 * np.pi * frequency * t / sample_rate)).astype(np.int16)
+                arr = np.stack([wave, wave], axis=1)  # Left/right channels
+                self._beep_cache[cache_key] = arr
             
             sound = pygame.sndarray.make_sound(arr)
             sound.play()
@@ -323,90 +442,123 @@ class PiAudioManager:
         except Exception as e:
             logger.error(f"❌ Error generating beep: {e}")
     
-    def _play_aplay(self, sound_file: str, alarm_id: str = None) -> bool:
+    def _read_wav_pcm(self, sound_file: str) -> Tuple[str, int, int, bytes, bytes]:
+        """Decode a PCM WAV file for raw aplay playback.
+
+        Returns (aplay format, rate, channels, frames, looped frames) where the
+        looped copy repeats the tone to at least ``_PCM_LOOP_SECONDS``.  The
+        result is cached per file, so only the first alarm reads the disk.
+        """
+        cached = self._pcm_cache.get(sound_file)
+        if cached is not None:
+            return cached
+        with wave.open(sound_file, 'rb') as wav:
+            fmt = _APLAY_FORMATS.get(wav.getsampwidth())
+            if fmt is None:
+                raise wave.Error(f"unsupported sample width {wav.getsampwidth()}")
+            rate, channels, nframes = wav.getframerate(), wav.getnchannels(), wav.getnframes()
+            pcm = wav.readframes(nframes)
+        if not pcm:
+            # An empty buffer would make _feed_pcm spin without ever yielding
+            raise wave.Error("no audio frames")
+        repeats = max(1, -(-_PCM_LOOP_SECONDS * rate // max(nframes, 1)))
+        cached = self._pcm_cache[sound_file] = (fmt, rate, channels, pcm, pcm * repeats)
+        return cached
+
+    async def _feed_pcm(self, process: asyncio.subprocess.Process, pcm: bytes, loop: bool):
+        """Write PCM to aplay's stdin, repeating it until the pipe closes."""
+        try:
+            while True:
+                process.stdin.write(pcm)
+                await process.stdin.drain()
+                if not loop:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            process.stdin.close()
+
+    async def _play_aplay(self, sound_file: Optional[str], alarm_id: str = None) -> bool:
         """Play alarm sound using aplay (ALSA)."""
         try:
-            logger.info(f"🔊 DEBUG: Attempting aplay with file: {sound_file}")
+            logger.debug("🔊 Attempting aplay with file: %s", sound_file)
             
-            if os.path.exists(sound_file):
+            if sound_file:
+                # Decode the WAV once and stream it into a single long-lived
+                # aplay; re-execing aplay from a shell loop costs a fork/exec
+                # per repeat and leaves an audible gap at every wrap.
+                try:
+                    if sound_file in self._pcm_cache:
+                        fmt, rate, channels, pcm, looped = self._pcm_cache[sound_file]
+                    else:
+                        fmt, rate, channels, pcm, looped = await asyncio.to_thread(self._read_wav_pcm, sound_file)
+                except (OSError, wave.Error, EOFError) as e:
+                    logger.error(f"❌ Can't decode {sound_file} for aplay: {e}")
+                    return await self._play_speaker_test(sound_file, alarm_id)
+
                 # Force output to the detected analog audio device to avoid HDMI routing issues
-                # Use a loop to repeat the audio file continuously
-                logger.info(f"🔊 DEBUG: Starting aplay subprocess for {sound_file} on {self.alsa_output} (looped)")
-
-                # Create clean environment without PulseAudio variables that conflict with ALSA
-                clean_env = os.environ.copy()
-                clean_env.pop('PULSE_RUNTIME_PATH', None)
-                clean_env.pop('PULSE_RUNTIME_DIR', None)
-                clean_env['ALSA_PCM_CARD'] = self.alsa_card  # Force ALSA to use detected card
-                clean_env['ALSA_PCM_DEVICE'] = self.alsa_device  # Force ALSA to use detected device
-
-                process = subprocess.Popen(
-                    ['sh', '-c', f'while true; do aplay -D {self.alsa_output} "{sound_file}"; done'],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    preexec_fn=os.setsid,
-                    env=clean_env,
+                logger.debug("🔊 Starting aplay subprocess for %s on %s (looped)", sound_file, self.alsa_output)
+
+                process = await asyncio.create_subprocess_exec(
+                    'aplay', '-q', '-D', self.alsa_output,
+                    f'--buffer-time={ALSA_BUFFER_US}', f'--period-time={ALSA_PERIOD_US}',
+                    '-t', 'raw', '-f', fmt, '-r', str(rate), '-c', str(channels),
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=_DEVNULL_FD,
+                    stderr=_DEVNULL_FD,
+                    # start_new_session does the setsid() in C; unlike a
+                    # preexec_fn it lets CPython spawn via vfork() instead of
+                    # fork(), skipping the page-table copy of this process.
+                    start_new_session=True,
+                    env=self._alsa_environ(),
                 )  # Create new process group with clean env
 
-                # Store process reference if alarm_id provided (for termination)
-                if alarm_id:
-                    self.active_processes[alarm_id] = process
-                    logger.info(f"🔊 DEBUG: Stored process {process.pid} for alarm {alarm_id}")
+                # Only alarms (which can be stopped) loop; one-off plays end
+                # when the buffer has been written once.
+                feeder = asyncio.create_task(
+                    self._feed_pcm(process, looped if alarm_id else pcm, loop=bool(alarm_id))
+                )
 
-                # Give process a moment to fail fast if there's an audio error
-                time.sleep(0.1)
+                # Store process reference if alarm_id provided (for termination)
+                state = self._alarms.get(alarm_id)
+                if state:
+                    state.process = process
+                    state.pgid = process.pid  # own session: pgid == pid
+                    state.feeder = feeder
+                    logger.debug("🔊 Stored process %s for alarm %s", process.pid, alarm_id)
 
-                # Check if process is still running (don't wait for completion)
-                if process.poll() is None:
-                    # Process is still running, which is good for continuous playback
-                    logger.info(f"🔊 DEBUG: aplay process {process.pid} is running")
-                    return True
-                else:
-                    # Process finished (either success or error)
-                    stdout, stderr = process.communicate()
-                    logger.info(f"🔊 DEBUG: aplay finished with return code: {process.returncode}")
-                
-                if process.returncode != 0:
-                    logger.error(f"❌ aplay failed with return code {process.returncode}")
-                    logger.error(f"❌ aplay stdout: {stdout.decode() if stdout else 'None'}")
-                    logger.error(f"❌ aplay stderr: {stderr.decode() if stderr else 'None'}")
-                
-                # Clean up process reference
-                if alarm_id and alarm_id in self.active_processes:
-                    self.active_processes.pop(alarm_id, None)
-                
-                return process.returncode == 0
+                return True
             else:
                 # Use speaker-test as fallback - this is more reliable than missing WAV files
-                logger.info(f"🔊 Sound file {sound_file} not found, using speaker-test fallback")
-                return self._play_speaker_test(sound_file, alarm_id)
+                logger.info("🔊 Alarm sound file not found, using speaker-test fallback")
+                return await self._play_speaker_test(sound_file, alarm_id)
         except subprocess.CalledProcessError as e:
             logger.error(f"❌ aplay CalledProcessError: {e}")
-            return self._play_speaker_test(sound_file, alarm_id)
+            return await self._play_speaker_test(sound_file, alarm_id)
         except Exception as e:
             logger.error(f"❌ aplay unexpected error: {e}")
             return False
     
-    def _play_paplay(self, sound_file: str) -> bool:
+    def _play_paplay(self, sound_file: Optional[str], alarm_id: str = None) -> bool:
         """Play alarm sound using paplay (PulseAudio)."""
         try:
-            if os.path.exists(sound_file):
+            if sound_file:
                 subprocess.run(['paplay', sound_file], check=True,
-                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                             stdout=_DEVNULL_FD, stderr=_DEVNULL_FD)
             else:
-                # Use speaker-test as fallback
-                return self._play_speaker_test(sound_file, None)
+                # Use speaker-test as fallback (runs on the audio loop)
+                return self._run(self._play_speaker_test(sound_file, None))
             return True
         except subprocess.CalledProcessError:
             return False
     
-    def _play_afplay(self, sound_file: str) -> bool:
+    def _play_afplay(self, sound_file: Optional[str], alarm_id: str = None) -> bool:
         """Play alarm sound using afplay (macOS)."""
         try:
             # If a specific sound file exists use it first
-            if os.path.exists(sound_file):
+            if sound_file:
                 subprocess.run(['afplay', sound_file], check=True, timeout=5,
-                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                               stdout=_DEVNULL_FD, stderr=_DEVNULL_FD)
                 return True
 
             # Fallback to system sounds on macOS
@@ -421,41 +573,42 @@ class PiAudioManager:
                 if os.path.exists(sound_path):
                     subprocess.run(['afplay', sound_path], 
                                  check=True, timeout=5,
-                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                                 stdout=_DEVNULL_FD, stderr=_DEVNULL_FD)
                     return True
             
             # If no system sounds found, generate a beep
             subprocess.run(['say', 'alarm'], check=True, timeout=3,
-                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                         stdout=_DEVNULL_FD, stderr=_DEVNULL_FD)
             return True
             
         except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
             return False
     
-    def _play_speaker_test(self, sound_file: str = None, alarm_id: str = None) -> bool:
+    async def _play_speaker_test(self, sound_file: str = None, alarm_id: str = None) -> bool:
         """Play alarm sound using speaker-test (fallback)."""
         try:
             # Force output to the detected analog audio device and play a 2-second 800Hz tone
-            process = subprocess.Popen(
-                ['speaker-test', '-D', self.alsa_output, '-t', 'sine', '-f', '800', '-l', '2'],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
+            process = await asyncio.create_subprocess_exec(
+                'speaker-test', '-D', self.alsa_output, '-t', 'sine', '-f', '800', '-l', '2',
+                stdout=_DEVNULL_FD,
+                stderr=_DEVNULL_FD,
             )
             
             # Store process reference if alarm_id provided (for termination)
-            if alarm_id:
-                self.active_processes[alarm_id] = process
+            state = self._alarms.get(alarm_id)
+            if state:
+                state.process = process
             
             # Wait for process to complete (with timeout)
             try:
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except asyncio.TimeoutError:
                 process.kill()
                 return False
             
             # Clean up process reference
-            if alarm_id and alarm_id in self.active_processes:
-                self.active_processes.pop(alarm_id, None)
+            if state:
+                state.process = None
             
             logger.info("🔊 speaker-test alarm sound played successfully")
             return process.returncode == 0
@@ -476,13 +629,7 @@ class PiAudioManager:
     def test_audio(self) -> bool:
         """Test audio output."""
         logger.info(f"🔊 Testing audio output using method: {self.audio_method}")
-        env_path = os.environ.get('ALARM_SOUND_FILE')
-        if env_path:
-            sound_file = env_path
-        else:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            sound_file = os.path.join(base_dir, 'sounds', 'alarm.wav')
-        return self._play_alarm_sound_once(sound_file)
+        return self._run(self._play_alarm_sound_once(self._default_sound_path()))
 
 # Global audio manager instance
 _audio_manager: Optional[PiAudioManager] = None
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: LicenseRef-CubeAlarm-Custom-Attribution
+# Copyright (c) 2025 Paul Shapiro
+"""
+Local tests for EnhancedGANCube shutdown.
+Runs without a cube or Bluetooth adapter: connect() is replaced by a slow fake.
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import types
+import unittest
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+# No BLE is used here; only stand in for bleak where it isn't installed.
+try:
+    import bleak  # noqa: F401
+except ImportError:
+    _bleak = types.ModuleType('bleak')
+    _bleak.BleakScanner = _bleak.BleakClient = object
+    sys.modules['bleak'] = _bleak
+
+import enhanced_gan_cube
+
+CONNECT_SECONDS = 0.2  # how long the fake connect() takes
+STOP_DEADLINE = 1.0    # run()/main() must return within this after a stop
+
+
+class _ConnectedClient:
+    is_connected = True
+
+    async def disconnect(self):
+        self.is_connected = False
+
+
+def _slow_connect(succeeds: bool):
+    """Return a connect() replacement that takes CONNECT_SECONDS."""
+    async def connect(self, timeout: int = 10) -> bool:
+        await asyncio.sleep(CONNECT_SECONDS)
+        if succeeds:
+            self.client = _ConnectedClient()
+            self.state.connected = True
+        return succeeds
+    return connect
+
+
+class StopMidConnectTest(unittest.TestCase):
+    """A stop request during scan/connect must end run() promptly."""
+
+    def _stop_during_connect(self, succeeds: bool):
+        async def scenario():
+            cube = enhanced_gan_cube.EnhancedGANCube()
+            task = asyncio.create_task(cube.run())
+            await asyncio.sleep(CONNECT_SECONDS / 2)  # inside connect()
+            cube.stop()
+            await asyncio.wait_for(task, STOP_DEADLINE)
+
+        original = enhanced_gan_cube.EnhancedGANCube.connect
+        enhanced_gan_cube.EnhancedGANCube.connect = _slow_connect(succeeds)
+        try:
+            asyncio.run(scenario())
+        finally:
+            enhanced_gan_cube.EnhancedGANCube.connect = original
+
+    def test_stop_while_connect_succeeds(self):
+        self._stop_during_connect(succeeds=True)
+
+    def test_stop_while_connect_fails(self):
+        self._stop_during_connect(succeeds=False)
+
+    def test_single_sigterm_stops_main(self):
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            loop.call_later(CONNECT_SECONDS / 2, os.kill, os.getpid(), signal.SIGTERM)
+            await asyncio.wait_for(enhanced_gan_cube.main(), CONNECT_SECONDS + STOP_DEADLINE)
+
+        original = enhanced_gan_cube.EnhancedGANCube.connect
+        enhanced_gan_cube.EnhancedGANCube.connect = _slow_connect(True)
+        try:
+            asyncio.run(scenario())
+        finally:
+            enhanced_gan_cube.EnhancedGANCube.connect = original
+
+
+class _FakeClient:
+    """BleakClient stand-in that keeps its disconnected_callback."""
+
+    def __init__(self, device, disconnected_callback=None):
+        self.disconnected_callback = disconnected_callback
+        self.is_connected = False
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def start_notify(self, uuid, handler):
+        pass
+
+    def drop(self):
+        """Simulate bleak reporting this client's link as lost."""
+        self.is_connected = False
+        self.disconnected_callback(self)
+
+
+class StaleDisconnectTest(unittest.TestCase):
+    """A late disconnect from an earlier client must not end the current session."""
+
+    def test_stale_client_callback_is_ignored(self):
+        async def scan_for_cube(timeout):
+            return types.SimpleNamespace(name="GAN-test", address="AA"), "AA:BB:CC:DD:EE:FF"
+
+        async def scenario():
+            cube = enhanced_gan_cube.EnhancedGANCube()
+            cube.scan_for_cube = scan_for_cube
+            cube._wake = asyncio.Event()
+            self.assertTrue(await cube.connect())
+            old_client = cube.client
+            self.assertTrue(await cube.connect())
+
+            old_client.drop()
+            self.assertTrue(cube.state.connected)
+            self.assertFalse(cube._wake.is_set())
+
+            cube.client.drop()
+            self.assertFalse(cube.state.connected)
+            self.assertTrue(cube._wake.is_set())
+            await cube.disconnect()
+
+        original = enhanced_gan_cube.BleakClient
+        enhanced_gan_cube.BleakClient = _FakeClient
+        try:
+            asyncio.run(scenario())
+        finally:
+            enhanced_gan_cube.BleakClient = original
+
+
+if __name__ == "__main__":
+    unittest.main()